@@ -0,0 +1,297 @@
+# Background loading of BreakOut3's sounds, and the asset pack.
+#
+# Decoding the sound files is a noticeable slice of startup, and nothing
+# needs them before the first ball is served. AssetLoader loads them on a
+# worker thread while the window opens and the title screen is drawn. Until
+# then every slot in Sounds holds a DummySound that plays nothing, and the
+# worker swaps the real Sounds in once the set has loaded.
+#
+# Release builds ship the sounds and the icon in one pack file. A sound is
+# stored once, as its raw samples with their frequency and sample format:
+# a WAV's own samples as they are, other files decoded by the mixer at build
+# time. The pack is memory-mapped, and when the mixer runs in the sounds'
+# format, which for the WAV set is mixer_format, they are handed to pygame as
+# views into the mapping, so loading is no more than the OS paging the file
+# in. In any other format a WAV header is put in front of the samples and the
+# mixer converts them. The icon is kept as its PNG bytes, a fraction of its
+# pixels:
+#
+#   header   magic b'BO3P', version, entry count
+#   index    one fixed-size entry per asset: name, kind, offset, size and two
+#            kind-specific fields (frequency and sample format for sounds,
+#            width and height for images)
+#   data     each asset's bytes, 16-byte aligned
+#
+# "python assets.py build" writes assets.pak from the files in the tree;
+# without a pack the game loads sounds/ as before.
+import argparse
+import io
+import mmap
+import os
+import struct
+import sys
+import threading
+import wave
+
+import pygame
+
+mixer_format = (44100, -16, 2)  # frequency, sample size, channels
+
+pack_name = 'assets.pak'
+PACK_MAGIC = b'BO3P'
+PACK_VERSION = 2
+PACK_HEADER = struct.Struct('<4sHH')
+PACK_ENTRY = struct.Struct('<32sB3xQQII')
+PACK_ALIGN = 16
+
+RAW = 0
+SOUND = 1
+IMAGE = 2
+
+# tried in order until one complete set loads
+sound_sets = [
+    ('WAV format', {'paddle': 'sounds/ball.wav', 'block': 'sounds/block.wav',
+                    'lost': 'sounds/lost.wav', 'won': 'sounds/won.wav'}),
+    ('original format', {'paddle': 'sounds/ball.aif', 'block': 'sounds/block.caf',
+                         'lost': 'sounds/lost.aif', 'won': 'sounds/won.aif'}),
+]
+
+
+class PackError(Exception):
+    pass
+
+
+def _sample_format(size, channels):
+    # a mixer format as one u32: sample size (as u16) and channel count
+    return (size & 0xFFFF) | channels << 16
+
+
+def _read_samples(path):
+    # (samples, frequency, sample format) of a sound file; a PCM WAV's
+    # samples are taken as they are, anything else the mixer decodes
+    if path.lower().endswith('.wav'):
+        try:
+            with wave.open(path, 'rb') as f:
+                if f.getsampwidth() in (1, 2):  # unsigned 8 bit or signed 16 bit
+                    size = 8 if f.getsampwidth() == 1 else -16
+                    return (f.readframes(f.getnframes()), f.getframerate(),
+                            _sample_format(size, f.getnchannels()))
+        except (wave.Error, EOFError):
+            pass
+    frequency, size, channels = pygame.mixer.get_init()
+    return pygame.mixer.Sound(path).get_raw(), frequency, _sample_format(size, channels)
+
+
+def _wav_file(samples, frequency, sample_format):
+    # samples behind a WAV header, for the mixer to convert
+    size = (sample_format & 0xFFFF) - (0x10000 if sample_format & 0x8000 else 0)
+    if size not in (8, -16):
+        raise PackError(f'can\'t convert {abs(size)} bit samples to the mixer\'s format')
+    out = io.BytesIO()
+    with wave.open(out, 'wb') as f:
+        f.setnchannels(sample_format >> 16)
+        f.setsampwidth(abs(size) // 8)
+        f.setframerate(frequency)
+        f.writeframes(samples)
+    out.seek(0)
+    return out
+
+
+class AssetPack:
+    """A memory-mapped asset pack; view() returns an asset's bytes without
+    copying them."""
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.buffer = memoryview(self.map)
+        if len(self.map) < PACK_HEADER.size:
+            raise PackError('not a BreakOut3 asset pack')
+        magic, version, count = PACK_HEADER.unpack_from(self.map)
+        if magic != PACK_MAGIC:
+            raise PackError('not a BreakOut3 asset pack')
+        if version != PACK_VERSION:
+            raise PackError(f'unsupported asset pack version {version}')
+        self.index = {}
+        for n in range(count):
+            name, kind, offset, size, a, b = PACK_ENTRY.unpack_from(self.map, PACK_HEADER.size + n * PACK_ENTRY.size)
+            if offset + size > len(self.map):
+                raise PackError('asset pack is truncated')
+            self.index[name.rstrip(b'\0').decode()] = (kind, offset, size, a, b)
+
+    def __contains__(self, name):
+        return name in self.index
+
+    def _entry(self, name, kind):
+        try:
+            entry = self.index[name]
+        except KeyError:
+            raise PackError(f'{name} is not in the asset pack') from None
+        if entry[0] != kind:
+            raise PackError(f'{name} is not a kind {kind} asset')
+        return entry
+
+    def view(self, name):
+        _, offset, size, _, _ = self.index[name]
+        return self.buffer[offset:offset + size]
+
+    def sound(self, name):
+        """pygame Sound from packed samples. pygame copies them into its own
+        chunk, straight from the mapping. If the mixer isn't in the format
+        they were packed in, it converts them instead."""
+        _, offset, size, frequency, sample_format = self._entry(name, SOUND)
+        samples = self.buffer[offset:offset + size]
+        current = pygame.mixer.get_init()
+        if current is not None and (frequency, sample_format) == (current[0], _sample_format(*current[1:])):
+            return pygame.mixer.Sound(buffer=samples)
+        return pygame.mixer.Sound(file=_wav_file(samples, frequency, sample_format))
+
+    def image(self, name):
+        """Surface decoded from the packed image file."""
+        _, offset, size, _, _ = self._entry(name, IMAGE)
+        return pygame.image.load(io.BytesIO(self.buffer[offset:offset + size]), name)
+
+
+def open_pack(path):
+    """The AssetPack at path, or None if there isn't a usable one."""
+    if not os.path.exists(path):
+        return None
+    try:
+        return AssetPack(path)
+    except (OSError, ValueError, PackError) as e:
+        print(f"⚠️  Ignoring asset pack {path}: {e}")
+        return None
+
+
+def write_pack(path, entries):
+    """Write (name, kind, data, a, b) entries as an asset pack."""
+    offset = PACK_HEADER.size + len(entries) * PACK_ENTRY.size
+    index = []
+    offsets = []
+    for name, kind, data, a, b in entries:
+        offset = -(-offset // PACK_ALIGN) * PACK_ALIGN
+        encoded = name.encode()
+        if len(encoded) > 32:
+            raise PackError(f'asset name {name} is longer than 32 bytes')
+        index.append(PACK_ENTRY.pack(encoded, kind, offset, len(data), a, b))
+        offsets.append(offset)
+        offset += len(data)
+    with open(path, 'wb') as f:
+        f.write(PACK_HEADER.pack(PACK_MAGIC, PACK_VERSION, len(entries)))
+        f.write(b''.join(index))
+        for (_, _, data, _, _), offset in zip(entries, offsets):
+            f.write(bytes(offset - f.tell()))
+            f.write(data)
+
+
+def build_pack(path, resource_path=os.path.abspath, icon='breakout3.png'):
+    """Pack the sounds' samples and the icon's PNG as an asset pack."""
+    pygame.mixer.init(*mixer_format)  # only decodes files that aren't PCM WAVs
+    entries = []
+    for description, files in sound_sets:
+        try:
+            loaded = {name: _read_samples(resource_path(files[name])) for name in Sounds.names}
+        except (pygame.error, OSError):
+            continue
+        for name, (samples, frequency, sample_format) in loaded.items():
+            entries.append((f'sound/{name}', SOUND, samples, frequency, sample_format))
+        break
+    else:
+        raise PackError('no complete set of sound files to pack')
+    image = pygame.image.load(resource_path(icon))
+    with open(resource_path(icon), 'rb') as f:
+        entries.append((icon, IMAGE, f.read(), *image.get_size()))
+    write_pack(path, entries)
+    return entries
+
+
+class DummySound:
+    def play(self): pass
+
+
+class Sounds:
+    """The game's sounds by name, silent until the loader fills them in."""
+
+    names = ('paddle', 'block', 'lost', 'won')
+
+    def __init__(self):
+        for name in self.names:
+            setattr(self, name, DummySound())
+
+
+class AssetLoader:
+    """Loads the sounds on a daemon thread; done is set when it finishes,
+    whether or not the files could be loaded."""
+
+    def __init__(self, resource_path, startup=None, pack=None):
+        self.resource_path = resource_path
+        self.startup = startup
+        self.pack = pack
+        self.sounds = Sounds()
+        self.loaded = False
+        self.done = threading.Event()
+        self.thread = threading.Thread(target=self._run, name='asset-loader', daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def wait(self, timeout=None):
+        return self.done.wait(timeout)
+
+    def _run(self):
+        try:
+            self._load_sounds()
+        finally:
+            if self.startup is not None:
+                self.startup.mark('assets')
+            self.done.set()
+
+    def _sources(self):
+        # (description, load(name)) in the order to try them
+        if self.pack is not None:
+            yield 'asset pack', lambda name: self.pack.sound(f'sound/{name}')
+        for description, files in sound_sets:
+            yield description, lambda name, files=files: pygame.mixer.Sound(self.resource_path(files[name]))
+
+    def _load_sounds(self):
+        error = None
+        for description, load in self._sources():
+            try:
+                loaded = {name: load(name) for name in Sounds.names}
+            except (pygame.error, OSError, PackError) as e:
+                error = e
+                continue
+            # rebinding an attribute is atomic, the main loop sees either sound
+            for name, sound in loaded.items():
+                setattr(self.sounds, name, sound)
+            self.loaded = True
+            print(f"✓ All sound files loaded successfully ({description})!")
+            return
+        print(f"⚠️  Error loading sound files: {error}")
+        print("Game will continue without sounds.")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Build or list a BreakOut3 asset pack.')
+    commands = parser.add_subparsers(dest='command', required=True)
+    build = commands.add_parser('build', help='pack the sounds and icon')
+    build.add_argument('output', nargs='?', default=pack_name, help='pack to write (default: %(default)s)')
+    listing = commands.add_parser('list', help='show the index of a pack')
+    listing.add_argument('pack', nargs='?', default=pack_name)
+    args = parser.parse_args(argv)
+
+    if args.command == 'build':
+        os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+        entries = build_pack(args.output)
+        print(f"✓ Packed {len(entries)} assets into {args.output} ({os.path.getsize(args.output):,} bytes)")
+        return 0
+    pack = AssetPack(args.pack)
+    kinds = {RAW: 'raw', SOUND: 'sound', IMAGE: 'image'}
+    for name, (kind, offset, size, a, b) in pack.index.items():
+        print(f"{name:<32} {kinds.get(kind, kind):<6} {offset:>10} {size:>10,} bytes  ({a}, {b})")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,106 @@
+# Sound playback for BreakOut3 through a fixed pool of mixer voices.
+#
+# Sound.play() grabs any free channel and once they are all busy new sounds
+# are dropped, which is what a multi-ball round with dozens of brick hits a
+# frame sounds like. VoicePool reserves channels for each class of sound,
+# so brick hits can't take the channel the game-over sound needs. trigger()
+# only notes the request and flush() starts each class at most once per
+# frame, highest priority first. When all of a class's channels are busy it
+# steals the voice with the lowest priority, oldest first, from its own
+# class or a less important one.
+#
+# The mixer buffer sets the latency the audio device adds (buffer frames /
+# rate); BREAKOUT3_AUDIO_BUFFER overrides the default, smaller is quicker
+# but may crackle on slow machines. report() prints that configured latency;
+# it is the device's nominal figure, not a measurement.
+import os
+import time
+
+import pygame
+
+# name: (reserved channels, priority)
+voice_classes = {
+    'paddle': (2, 2),
+    'block': (4, 1),
+    'lost': (1, 3),
+    'won': (1, 3),
+}
+
+default_buffer = 512  # sample frames
+
+
+def mixer_buffer():
+    """Mixer buffer size in sample frames, from BREAKOUT3_AUDIO_BUFFER if set."""
+    try:
+        return max(int(os.environ.get('BREAKOUT3_AUDIO_BUFFER', default_buffer)), 32)
+    except ValueError:
+        return default_buffer
+
+
+class VoicePool:
+    """Plays the sounds in sounds (an assets.Sounds) on reserved channels."""
+
+    def __init__(self, sounds, classes=voice_classes, buffer=default_buffer, clock=time.perf_counter):
+        self.sounds = sounds
+        self.buffer = buffer
+        self.clock = clock
+        self.priority = {name: priority for name, (_, priority) in classes.items()}
+        self.voices = {}    # name -> [[channel, priority playing, started], ...]
+        self.pending = set()  # names triggered since the last flush
+        self.triggers = 0
+        self.plays = 0
+        self.stolen = 0
+        if pygame.mixer.get_init() is None:
+            return  # no audio device, nothing will play
+        total = sum(count for count, _ in classes.values())
+        if pygame.mixer.get_num_channels() < total:
+            pygame.mixer.set_num_channels(total)
+        pygame.mixer.set_reserved(total)  # keep Sound.play() off them
+        first = 0
+        for name, (count, _) in classes.items():
+            self.voices[name] = [[pygame.mixer.Channel(n), 0, 0.0] for n in range(first, first + count)]
+            first += count
+
+    def trigger(self, name):
+        self.triggers += 1
+        self.pending.add(name)
+
+    def flush(self):
+        """Start the sounds triggered since the last flush, once each."""
+        if not self.pending:
+            return
+        for name in sorted(self.pending, key=self.priority.get, reverse=True):
+            self.play(name)
+        self.pending.clear()
+
+    def play(self, name):
+        sound = getattr(self.sounds, name)
+        if name not in self.voices or not isinstance(sound, pygame.mixer.Sound):
+            return False  # no mixer, or the sound hasn't loaded yet
+        for voice in self.voices[name]:
+            if not voice[0].get_busy():
+                break
+        else:
+            # free first, then the least important, then the oldest
+            priority = self.priority[name]
+            candidates = [voice for other, voices in self.voices.items() if self.priority[other] <= priority
+                          for voice in voices]
+            voice = min(candidates, key=lambda voice: (voice[0].get_busy(), voice[1], voice[2]))
+            if voice[0].get_busy():
+                self.stolen += 1
+        voice[0].play(sound)
+        voice[1] = self.priority[name]
+        voice[2] = self.clock()
+        self.plays += 1
+        return True
+
+    def report(self):
+        """A line for the console: the configured buffer latency, merges and
+        steals."""
+        init = pygame.mixer.get_init()
+        if init is None:
+            return 'Audio: no mixer'
+        line = (f'Audio: configured buffer latency {self.buffer / init[0] * 1e3:.1f} ms '
+                f'({self.buffer} frames at {init[0]} Hz)')
+        line += f'; {self.triggers} triggers, {self.plays} played, {self.stolen} voices stolen'
+        return line
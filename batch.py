@@ -0,0 +1,202 @@
+# Vectorized BreakOut3 simulation for running thousands of rounds at once.
+#
+# BatchSimulator keeps every game's ball, paddle and brick strengths in NumPy
+# arrays and advances all of them with one step() call. It reproduces
+# simulation.GameState frame for frame: the same paddle smoothing and
+# clamping, the same collision_thresh side tests in the same brick order, and
+# the same speed_max clamping off the paddle. Only the overlap-test collision
+# is vectorized; balls fast enough for GameBall.move_swept are not supported.
+#
+# Requires numpy (pip install numpy); the game itself does not.
+import numpy as np
+
+from simulation import Wall, Paddle, GameBall, screen_width, game_height, rows, cols
+
+
+class BatchSimulator:
+    """n independent rounds, each starting like GameState.start().
+
+    layout is an optional (rows, cols) strength grid shared by all games, or
+    an (n, rows, cols) array with one layout per game. Games stop advancing
+    once game_over is non-zero (1 won, -1 lost).
+    """
+
+    def __init__(self, n, rows=rows, cols=cols, layout=None):
+        self.n = n
+        self.rows = rows
+        self.cols = cols
+        wall = Wall(rows, cols)
+        self.block_width = wall.width
+        self.block_height = wall.height
+        self.layout = layout
+
+        # geometry shared by every game
+        paddle = Paddle()
+        ball = GameBall(paddle.x + (paddle.width // 2), paddle.y - paddle.height)
+        self.paddle_width = paddle.width
+        self.paddle_height = paddle.height
+        self.paddle_y = paddle.y
+        self.paddle_speed = paddle.speed
+        self.ball_size = ball.rect.width
+        self.collision_thresh = GameBall.collision_thresh
+
+        # the most grid cells a ball can overlap along each axis
+        self.span_rows = (self.ball_size + self.block_height - 2) // self.block_height + 1
+        self.span_cols = (self.ball_size + self.block_width - 2) // self.block_width + 1
+
+        self.index = np.arange(n)
+        self.strength = np.zeros((n, rows * cols), dtype=np.uint8)
+        self.live = np.zeros(n, dtype=np.int64)
+        self.ball_x = np.zeros(n, dtype=np.int64)
+        self.ball_y = np.zeros(n, dtype=np.int64)
+        self.speed_x = np.zeros(n, dtype=np.int64)
+        self.speed_y = np.zeros(n, dtype=np.int64)
+        self.speed_max = np.zeros(n, dtype=np.int64)
+        self.paddle_x = np.zeros(n, dtype=np.int64)
+        self.target_x = np.zeros(n, dtype=np.int64)
+        self.direction = np.zeros(n, dtype=np.int64)
+        self.game_over = np.zeros(n, dtype=np.int8)
+        self.frames = np.zeros(n, dtype=np.int64)
+        self.block_hits = np.zeros(n, dtype=np.int64)
+        self.paddle_hits = np.zeros(n, dtype=np.int64)
+        self.reset()
+
+    def reset(self, games=None):
+        """Start a new round in every game, or only in the games selected by
+        an index or boolean mask."""
+        if games is None:
+            games = slice(None)
+        wall = Wall(self.rows, self.cols)
+        layout = self.layout
+        if layout is None or np.ndim(layout) == 2:
+            wall.create_wall(layout)
+            self.strength[games] = np.frombuffer(wall.snapshot(), dtype=np.uint8)
+        else:
+            self.strength[games] = np.asarray(layout, dtype=np.uint8).reshape(self.n, -1)[games]
+        self.live[games] = np.count_nonzero(self.strength[games], axis=-1)
+
+        paddle = Paddle()
+        ball = GameBall(paddle.x + (paddle.width // 2), paddle.y - paddle.height)
+        self.ball_x[games] = ball.rect.x
+        self.ball_y[games] = ball.rect.y
+        self.speed_x[games] = ball.speed_x
+        self.speed_y[games] = ball.speed_y
+        self.speed_max[games] = ball.speed_max
+        self.paddle_x[games] = paddle.rect.x
+        self.target_x[games] = paddle.target_x
+        self.direction[games] = paddle.direction
+        self.game_over[games] = 0
+        self.frames[games] = 0
+        self.block_hits[games] = 0
+        self.paddle_hits[games] = 0
+
+    def step(self, target_x=None, left=None, right=None):
+        """Advance every running game one frame.
+
+        target_x, left and right are per-game arrays playing the part of
+        FrameInput; in target_x a negative value means no touch this frame.
+        """
+        running = self.game_over == 0
+        self._input(running, target_x, left, right)
+        self._move_paddle(running)
+        self._move_ball(running)
+        self.frames += running
+        return self.game_over
+
+    def _input(self, running, target_x, left, right):
+        # same handling as GameState.step, applied to running games only
+        if target_x is not None:
+            touch = running & (np.asarray(target_x) >= 0)
+            self.target_x[touch] = np.asarray(target_x)[touch]
+        centre = self.paddle_width // 2
+        if left is not None:
+            keys = running & np.asarray(left, dtype=bool)
+            self.paddle_x[keys] -= self.paddle_speed
+            self.target_x[keys] = self.paddle_x[keys] + centre
+        if right is not None:
+            keys = running & np.asarray(right, dtype=bool)
+            self.paddle_x[keys] += self.paddle_speed
+            self.target_x[keys] = self.paddle_x[keys] + centre
+        np.clip(self.paddle_x, 0, screen_width - self.paddle_width, out=self.paddle_x)
+
+    def _move_paddle(self, running):
+        # Paddle.move: smoothly interpolate toward target_x, then clamp
+        dx = np.where(running, self.target_x - (self.paddle_x + self.paddle_width // 2), 0)
+        self.paddle_x += np.trunc(dx * 0.2).astype(np.int64)
+        np.clip(self.paddle_x, 0, screen_width - self.paddle_width, out=self.paddle_x)
+        self.direction = np.where(running, np.sign(dx), self.direction)
+
+    def _move_ball(self, running):
+        thresh = self.collision_thresh
+        size = self.ball_size
+        bw = self.block_width
+        bh = self.block_height
+        left = self.ball_x
+        top = self.ball_y
+        right = left + size
+        bottom = top + size
+        sx = self.speed_x
+        sy = self.speed_y
+
+        # Wall.cell_range for every ball at once
+        first_row = np.maximum(top // bh, 0)
+        last_row = np.minimum((bottom - 1) // bh, self.rows - 1)
+        first_col = np.maximum(left // bw, 0)
+        last_col = np.minimum((right - 1) // bw, self.cols - 1)
+
+        # visit the overlapped cells in the same row-major order as
+        # GameBall.move so the side tests see the same running speeds
+        for dr in range(self.span_rows):
+            row = first_row + dr
+            row_ok = running & (row <= last_row)
+            if not row_ok.any():
+                continue
+            block_top = row * bh
+            for dc in range(self.span_cols):
+                col = first_col + dc
+                valid = row_ok & (col <= last_col)
+                if not valid.any():
+                    continue
+                cell = np.where(valid, row * self.cols + col, 0)
+                hit = valid & (self.strength[self.index, cell] > 0)
+                if not hit.any():
+                    continue
+                block_left = col * bw
+                # check if collision was from above / below
+                sy[hit & (np.abs(bottom - block_top) < thresh) & (sy > 0)] *= -1
+                sy[hit & (np.abs(top - (block_top + bh)) < thresh) & (sy < 0)] *= -1
+                # check if collision was from left / right
+                sx[hit & (np.abs(right - block_left) < thresh) & (sx > 0)] *= -1
+                sx[hit & (np.abs(left - (block_left + bw)) < thresh) & (sx < 0)] *= -1
+                # reduce the block's strength by doing damage to it
+                games = self.index[hit]
+                self.strength[games, cell[hit]] -= 1
+                self.live[games] -= self.strength[games, cell[hit]] == 0
+                self.block_hits[games] += 1
+
+        # Check if the wall is destroyed (game won)
+        self.game_over[running & (self.live == 0)] = 1
+
+        # check for collision with walls and the top of the game area
+        sx[running & ((left < 0) | (right > screen_width))] *= -1
+        sy[running & (top < 0)] *= -1
+
+        # look for collision with paddle
+        px = self.paddle_x
+        on_paddle = (running & (left < px + self.paddle_width) & (right > px)
+                     & (top < self.paddle_y + self.paddle_height) & (bottom > self.paddle_y))
+        self.paddle_hits += on_paddle & (sy > 0)
+        from_top = on_paddle & (np.abs(bottom - self.paddle_y) < thresh) & (sy > 0)
+        sy[from_top] *= -1
+        sx[from_top] += self.direction[from_top]
+        too_fast = from_top & (sx > self.speed_max)
+        sx[too_fast] = self.speed_max[too_fast]
+        too_fast = from_top & (sx < -self.speed_max)
+        sx[too_fast] = -self.speed_max[too_fast]
+        sx[on_paddle & ~from_top] *= -1
+
+        self.ball_x += np.where(running, sx, 0)
+        self.ball_y += np.where(running, sy, 0)
+
+        # Check for ball missing the paddle (game lost condition)
+        self.game_over[running & (self.ball_y + size > game_height)] = -1
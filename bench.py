@@ -0,0 +1,261 @@
+# Benchmarks for the BreakOut3 simulation and rendering hot paths.
+#
+# Runs without a window or audio device (SDL dummy drivers) and times
+# GameBall.move, Paddle.move, Wall.create_wall, drawing the wall, the text
+# helpers and a whole main-loop frame across wall sizes and ball counts.
+# Results are printed, optionally saved as JSON, and compared against a
+# saved baseline:
+#
+#   python bench.py --output baseline.json
+#   python bench.py --baseline baseline.json --threshold 0.25
+#
+# The exit status is 1 when any case's ops/sec dropped by more than the
+# threshold against the baseline.
+import os
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+import argparse
+import json
+import platform
+import sys
+import time
+
+import pygame
+
+from simulation import GameState, GameBall, Paddle, Wall, FrameInput, screen_width, screen_height
+from render import Renderer, text_cache, draw_text, draw_text_centered
+from fontcache import load_font
+from levels import default_brick_height
+
+# column counts a level can have (see levels.py); bricks are
+# default_brick_height(rows) tall, so every wall stays above the paddle
+wall_sizes = [(6, 6), (20, 20), (50, 50), (100, 130), (200, 325)]
+ball_counts = [1, 10, 100]
+multiball_counts = [100, 500]  # balls in play for the multi-ball frame cases
+
+
+def _percentile(sorted_samples, fraction):
+    index = min(int(len(sorted_samples) * fraction), len(sorted_samples) - 1)
+    return sorted_samples[index]
+
+
+def measure(name, op, samples, setup=None, ops_per_sample=1):
+    """Time op() samples times after a short warmup and summarize.
+
+    setup(), if given, runs untimed before every sample. Latencies are per
+    op, in microseconds.
+    """
+    for _ in range(max(samples // 10, 1)):
+        if setup is not None:
+            setup()
+        op()
+    times = []
+    clock = time.perf_counter_ns
+    for _ in range(samples):
+        if setup is not None:
+            setup()
+        began = clock()
+        op()
+        times.append((clock() - began) / ops_per_sample)
+    total = sum(times)
+    times.sort()
+    return {
+        'name': name,
+        'ops_per_sec': len(times) * 1e9 / total if total else float('inf'),
+        'p50_us': _percentile(times, 0.50) / 1e3,
+        'p99_us': _percentile(times, 0.99) / 1e3,
+        'samples': samples,
+    }
+
+
+def _full_wall(rows, cols):
+    # every brick standing, strengths 1-3
+    wall = Wall(rows, cols, default_brick_height(rows))
+    wall.create_wall([[1 + (row + col) % 3 for col in range(cols)] for row in range(rows)])
+    return wall
+
+
+def bench_ball_move(rows, cols, balls, samples):
+    # balls moving against one wall, restored whenever it is cleared
+    wall = _full_wall(rows, cols)
+    full = wall.snapshot()
+    paddle = Paddle()
+    start_x = paddle.x + paddle.width // 2
+    start_y = paddle.y - paddle.height
+    pool = []
+    for i in range(balls):
+        ball = GameBall(start_x, start_y)
+        ball.speed_x = (i % 9) - 4 or 3
+        pool.append(ball)
+
+    def setup():
+        if wall.live == 0:
+            wall.restore(full)
+        for ball in pool:
+            if ball.game_over:
+                ball.reset(start_x, start_y)
+
+    def op():
+        for ball in pool:
+            ball.move(wall, paddle)
+            paddle.target_x = ball.rect.centerx
+
+    return measure(f'GameBall.move[{rows}x{cols},balls={balls}]', op, samples, setup, ops_per_sample=balls)
+
+
+def bench_paddle_move(samples):
+    paddle = Paddle()
+    targets = [0, screen_width, screen_width // 2]
+    state = {'i': 0}
+
+    def setup():
+        state['i'] += 1
+        paddle.set_target(targets[state['i'] % 3])
+
+    return measure('Paddle.move', paddle.move, samples, setup)
+
+
+def bench_create_wall(rows, cols, samples):
+    wall = Wall(rows, cols)
+    return measure(f'Wall.create_wall[{rows}x{cols}]', wall.create_wall, samples)
+
+
+def bench_draw_wall(rows, cols, samples, screen, fonts):
+    # composing every brick into the cached wall surface (full redraw)
+    state = GameState(rows, cols, layout=_full_wall(rows, cols).snapshot(),
+                      brick_height=default_brick_height(rows))
+    renderer = Renderer(screen, *fonts)
+    renderer.draw(state)
+    return measure(f'draw_wall[{rows}x{cols}]', lambda: renderer.build(state), samples)
+
+
+def bench_text(samples, screen, fonts):
+    font, title_font = fonts
+    helpers = [('draw_text', lambda: draw_text(screen, 'YOU WON!', font, (0, 251, 115), 240, 375)),
+               ('draw_text_centered',
+                lambda: draw_text_centered(screen, 'BreakOut 3', title_font, (0, 251, 115), 425))]
+    results = []
+    for name, op in helpers:
+        results.append(measure(f'{name}[cached]', op, samples))
+        results.append(measure(f'{name}[uncached]', op, samples, setup=text_cache.clear))
+    text_cache.clear()
+    return results
+
+
+def bench_frame(rows, cols, samples, screen, fonts, balls=1):
+    # one main-loop frame of live play: step, repaint, display.update
+    state = GameState(rows, cols, layout=_full_wall(rows, cols).snapshot(), balls=balls,
+                      brick_height=default_brick_height(rows))
+    renderer = Renderer(screen, *fonts)
+    state.subscribe(renderer.on_event)
+    state.step(FrameInput(start=True))
+    renderer.draw(state)
+
+    def setup():
+        if not state.live_ball:
+            state.step(FrameInput(start=True))
+            pygame.display.update(renderer.draw(state))
+
+    def op():
+        state.step(FrameInput(state.ball.rect.centerx))
+        pygame.event.pump()
+        pygame.display.update(renderer.draw(state))
+
+    name = f'frame[{rows}x{cols}]' if balls == 1 else f'frame[{rows}x{cols},balls={balls}]'
+    return measure(name, op, samples, setup)
+
+
+def run(quick=False, only=None):
+    pygame.init()
+    screen = pygame.display.set_mode((screen_width, screen_height))
+    fonts = (load_font('Impact', 30, 'fonts/freesansbold.ttf'), load_font('Impact', 75, 'fonts/freesansbold.ttf'))
+    scale = 10 if quick else 1
+    sizes = wall_sizes[:3] if quick else wall_sizes
+
+    # (name, benchmark) pairs; the name is used for --filter
+    cases = []
+    for rows, cols in sizes:
+        for balls in ball_counts:
+            cases.append((f'GameBall.move[{rows}x{cols},balls={balls}]',
+                          lambda r=rows, c=cols, b=balls: bench_ball_move(r, c, b, 2000 // scale)))
+    cases.append(('Paddle.move', lambda: bench_paddle_move(20000 // scale)))
+    for rows, cols in sizes:
+        cases.append((f'Wall.create_wall[{rows}x{cols}]',
+                      lambda r=rows, c=cols: bench_create_wall(r, c, max(200 // scale, 5))))
+        cases.append((f'draw_wall[{rows}x{cols}]',
+                      lambda r=rows, c=cols: bench_draw_wall(r, c, max(100 // scale, 5), screen, fonts)))
+        cases.append((f'frame[{rows}x{cols}]',
+                      lambda r=rows, c=cols: bench_frame(r, c, 2000 // scale, screen, fonts)))
+    for rows, cols in sizes[:3]:
+        for balls in multiball_counts:
+            cases.append((f'frame[{rows}x{cols},balls={balls}]',
+                          lambda r=rows, c=cols, b=balls: bench_frame(r, c, 500 // scale, screen, fonts, b)))
+    cases.append(('draw_text draw_text_centered', lambda: bench_text(2000 // scale, screen, fonts)))
+
+    results = []
+    for name, case in cases:
+        if only and only not in name:
+            continue
+        outcome = case()
+        for result in outcome if isinstance(outcome, list) else [outcome]:
+            print(f"{result['name']:<40} {result['ops_per_sec']:>14,.0f} ops/s"
+                  f"   p50 {result['p50_us']:>10.2f} us   p99 {result['p99_us']:>10.2f} us")
+            results.append(result)
+    pygame.quit()
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Names of the cases whose ops/sec fell more than threshold below the
+    baseline, each with its ratio."""
+    old = {case['name']: case for case in baseline['results']}
+    regressions = []
+    for case in results:
+        before = old.get(case['name'])
+        if before is None or not before['ops_per_sec']:
+            continue
+        ratio = case['ops_per_sec'] / before['ops_per_sec']
+        if ratio < 1.0 - threshold:
+            regressions.append((case['name'], ratio))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark BreakOut3 hot paths.')
+    parser.add_argument('--quick', action='store_true', help='fewer samples and only small walls')
+    parser.add_argument('--filter', metavar='TEXT', help='only run cases whose name contains TEXT')
+    parser.add_argument('--output', metavar='FILE', help='save results as JSON')
+    parser.add_argument('--baseline', metavar='FILE', help='compare against results saved with --output')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='allowed ops/sec drop against the baseline (default: %(default)s)')
+    args = parser.parse_args(argv)
+
+    results = run(args.quick, args.filter)
+    report = {
+        'python': platform.python_version(),
+        'pygame': pygame.version.ver,
+        'machine': platform.machine(),
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        for name, ratio in regressions:
+            print(f"✗ {name} regressed: {ratio:.0%} of baseline ops/sec")
+        if regressions:
+            return 1
+        print(f"✓ No regressions beyond {args.threshold:.0%}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
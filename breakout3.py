@@ -2,6 +2,23 @@ import pygame
 from pygame.locals import *
 import sys
 import os
+import argparse
+
+import fontcache
+
+from simulation import GameState, FrameInput, Paddle, screen_width, game_height, screen_height, PADDLE_HIT, BLOCK_HIT, WON, LOST
+from render import Renderer
+from timestep import FixedTimestep, sim_rate
+from replay import InputRecorder, InputLog
+from rewind import RewindBuffer
+from levels import load_levels, LevelError
+from assets import AssetLoader, open_pack, pack_name, mixer_format
+from audio import VoicePool, mixer_buffer
+try:
+    from particles import ParticleSystem
+except ImportError:  # numpy is optional, the game just has no debris without it
+    ParticleSystem = None
+from profiler import FrameProfiler, ProfileOverlay, StartupLog, LatencyProbe, EVENTS, INPUT, PHYSICS, DRAW, UPDATE
 
 # Get the correct path for bundled resources (PyInstaller)
 def resource_path(relative_path):
@@ -12,356 +29,304 @@ def resource_path(relative_path):
         base_path = os.path.abspath(".")
     return os.path.join(base_path, relative_path)
 
+# time each phase of startup, printed once the first frame is up
+startup = StartupLog()
+
 # Initialize Pygame and the mixer
-pygame.mixer.pre_init(44100, -16, 2, 512) 
+pygame.mixer.pre_init(*mixer_format, mixer_buffer())
 pygame.init()
 pygame.mixer.init()
+startup.mark('pygame.init')
 
-screen_width = 650
-game_height = 650          # Original game area height
-touchpad_height = 200      # Dedicated touchpad area
-screen_height = game_height + touchpad_height
+# sounds load in the background while the window opens and the title
+# screen is drawn; until then they play nothing. Builds ship them
+# pre-decoded in a memory-mapped asset pack, source checkouts use sounds/
+pack = open_pack(resource_path(pack_name))
+loader = AssetLoader(resource_path, startup, pack).start()
+sounds = loader.sounds
+# sounds play on reserved voices, at most once per class per frame
+voices = VoicePool(sounds, buffer=mixer_buffer())
 
 screen = pygame.display.set_mode((screen_width, screen_height))
 pygame.display.set_caption('Breakout')
+startup.mark('set_mode')
 
 # Set custom dock icon (MUST be done AFTER set_mode on macOS!)
 try:
-    icon = pygame.image.load(resource_path('breakout3.png'))
+    if pack is not None and 'breakout3.png' in pack:
+        icon = pack.image('breakout3.png')
+    else:
+        icon = pygame.image.load(resource_path('breakout3.png'))
     pygame.display.set_icon(icon)
 except Exception as e:
     print(f"Could not load custom icon: {e}")
 
-# define font
-font = pygame.font.SysFont('Impact', 30)
-title_font = pygame.font.SysFont('Impact', 75,)  # New larger bold font for title
-
-# define colours
-bg = (0, 0, 0)
-block_red = (255, 27, 145)
-block_green = (139, 255, 74)
-block_blue = (0, 188, 255)
-paddle_col = (171, 71, 188)
-paddle_outline = (171, 71, 188)
-text_col = (0, 251, 115)
-touchpad_bg = (40, 40, 40)
+# define font (resolved once and cached, see fontcache.py)
+font_path = fontcache.resolve('Impact', resource_path('fonts/freesansbold.ttf'))
+font = pygame.font.Font(font_path, 30)
+title_font = pygame.font.Font(font_path, 75)  # New larger bold font for title
+startup.mark('fonts')
 
 # define game variables
-cols = 6
-rows = 6
 clock = pygame.time.Clock()
-fps = 60
-live_ball = False
-game_over = 0 # 0 is playing, 1 is won, -1 is lost
-
-# -----------------------------------------------------
-# Sound Loading Section
-# -----------------------------------------------------
-sounds_loaded = False
-try:
-    SND_PADDLE = pygame.mixer.Sound(resource_path('sounds/ball.wav'))
-    SND_BLOCK = pygame.mixer.Sound(resource_path('sounds/block.wav'))
-    SND_GAMEOVER = pygame.mixer.Sound(resource_path('sounds/lost.wav'))
-    SND_WIN = pygame.mixer.Sound(resource_path('sounds/won.wav'))
-    sounds_loaded = True
-    print("✓ All sound files loaded successfully (WAV format)!")
-except:
-    try:
-        SND_PADDLE = pygame.mixer.Sound(resource_path('sounds/ball.aif'))
-        SND_BLOCK = pygame.mixer.Sound(resource_path('sounds/block.caf'))
-        SND_GAMEOVER = pygame.mixer.Sound(resource_path('sounds/lost.aif'))
-        SND_WIN = pygame.mixer.Sound(resource_path('sounds/won.aif'))
-        sounds_loaded = True
-        print("✓ All sound files loaded successfully (original format)!")
-    except pygame.error as e:
-        print(f"⚠️  Error loading sound files: {e}")
-        print("Game will continue without sounds.")
-        class DummySound:
-            def play(self): pass
-        SND_PADDLE = DummySound()
-        SND_BLOCK = DummySound()
-        SND_GAMEOVER = DummySound()
-        SND_WIN = DummySound()
-
-# function for outputting text onto the screen
-def draw_text(text, text_font, text_column, x, y):
-    img = text_font.render(text, True, text_column)
-    screen.blit(img, (x, y))
-
-# New function for drawing centered text
-def draw_text_centered(text, text_font, text_column, y):
-    img = text_font.render(text, True, text_column)
-    text_rect = img.get_rect(center=(screen_width // 2, y))
-    screen.blit(img, text_rect)
-
-# brick wall class
-class Wall:
-    def __init__(self):
-        self.blocks = []
-        self.width = screen_width // cols
-        self.height = 50
-
-    def create_wall(self):
-        self.blocks = []  # Clear existing blocks
-        for row in range(rows):
-            block_row = []
-            for col in range(cols):
-                block_x = col * self.width
-                block_y = row * self.height
-                rect = pygame.Rect(block_x, block_y, self.width, self.height)
-                strength = 0
-                if row < 2:
-                    strength += 3
-                elif row < 4:
-                    strength += 2
-                elif row < 6:
-                    strength += 1
-                block_individual = [rect, strength]
-                block_row.append(block_individual)
-            self.blocks.append(block_row)
-
-    def draw_wall(self):
-        for row in self.blocks:
-            for block in row:
-                block_col = bg
-                if block[1] == 3:
-                    block_col = block_blue
-                elif block[1] == 2:
-                    block_col = block_green
-                elif block[1] == 1:
-                    block_col = block_red
-                pygame.draw.rect(screen, block_col, block[0])
-                pygame.draw.rect(screen, bg, (block[0]), 2)
-
-# paddle class
-class Paddle():
-    def __init__(self):
-        self.direction = 1
-        self.reset()
-        self.target_x = self.rect.centerx  # target position from touch input
-
-    def move(self):
-        # Smoothly interpolate toward target_x
-        dx = self.target_x - self.rect.centerx
-        self.rect.x += int(dx * 0.2)  # adjust smoothing factor (0.2 = 20%)
-        # Clamp inside screen
-        if self.rect.left < 0:
-            self.rect.left = 0
-        if self.rect.right > screen_width:
-            self.rect.right = screen_width
-        # Update direction for ball spin effect
-        self.direction = 1 if dx > 0 else (-1 if dx < 0 else 0)
-
-    def set_target(self, x):
-        self.target_x = x
-
-    def draw(self):
-        pygame.draw.rect(screen, paddle_col, self.rect)
-        pygame.draw.rect(screen, paddle_outline, self.rect, 3)
-
-    def reset(self):
-        self.height = 20
-        self.width = int(screen_width / cols)
-        self.x = int((screen_width / 2) - (self.width / 2))
-        # Keep paddle above the game area (not inside touchpad)
-        self.y = game_height - (self.height * 2)
-        self.speed = 10
-        self.rect = Rect(self.x, self.y, self.width, self.height)
-        self.direction = 0
-        self.target_x = self.rect.centerx
-
-# ball class
-class GameBall:
-    def __init__(self, x, y):
-        self.reset(x, y)
-
-    def move(self):
-        # collision threshold
-        collision_thresh = 5
-        wall_destroyed = 1
-        
-        for row_count, row in enumerate(wall.blocks):
-            for item_count, item in enumerate(row):
-                # check collision
-                if self.rect.colliderect(item[0]):
-                    # Play block hit sound
-                    SND_BLOCK.play()
-                    
-                    # check if collision was from above
-                    if abs(self.rect.bottom - item[0].top) < collision_thresh and self.speed_y > 0:
-                        self.speed_y *= -1
-                    # check if collision was from below
-                    if abs(self.rect.top - item[0].bottom) < collision_thresh and self.speed_y < 0:
-                        self.speed_y *= -1
-                    # check if collision was from left
-                    if abs(self.rect.right - item[0].left) < collision_thresh and self.speed_x > 0:
-                        self.speed_x *= -1
-                    # check if collision was from right
-                    if abs(self.rect.left - item[0].right) < collision_thresh and self.speed_x < 0:
-                        self.speed_x *= -1
-                    # reduce the block's strength by doing damage to it
-                    if wall.blocks[row_count][item_count][1] > 1:
-                        wall.blocks[row_count][item_count][1] -= 1
-                    else:
-                        # Make block disappear (set to an empty rect)
-                        wall.blocks[row_count][item_count][0] = pygame.Rect(0, 0, 0, 0)
-                        wall.blocks[row_count][item_count][1] = 0
-
-                # check if block still exists, in which case the wall is not destroyed
-                if wall.blocks[row_count][item_count][1] > 0:
-                    wall_destroyed = 0
-        
-        # Check if the wall is destroyed (game won)
-        if wall_destroyed == 1:
-            self.game_over = 1
-
-        # check for collision with walls
-        if self.rect.left < 0 or self.rect.right > screen_width:
-            self.speed_x *= -1
-
-        # check for collision with top of the game area
-        if self.rect.top < 0:
-            self.speed_y *= -1
-
-        # look for collision with paddle
-        if self.rect.colliderect(player_paddle):
-            # Play paddle hit sound (only when ball is coming down)
-            if self.speed_y > 0: 
-                 SND_PADDLE.play()
-
-            # check if colliding from the top
-            if abs(self.rect.bottom - player_paddle.rect.top) < collision_thresh and self.speed_y > 0:
-                self.speed_y *= -1
-                self.speed_x += player_paddle.direction
-                if self.speed_x > self.speed_max:
-                    self.speed_x = self.speed_max
-                elif self.speed_x < 0 and self.speed_x < -self.speed_max:
-                    self.speed_x = -self.speed_max
+fps = 60  # render rate cap, the simulation runs at sim_rate
+attract_interval = 500  # ms between idle frames while waiting for a round to start
+
+# play sounds for game events
+def play_sound(event, data):
+    if event == PADDLE_HIT:
+        voices.trigger('paddle')
+    elif event == BLOCK_HIT:
+        voices.trigger('block')
+    elif event == LOST:
+        voices.trigger('lost')
+    elif event == WON:
+        voices.trigger('won')
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='BreakOut3')
+    parser.add_argument('--fps', type=int, default=fps,
+                        help='render frame rate cap, 0 for uncapped (default: %(default)s)')
+    parser.add_argument('--balls', type=int, default=1,
+                        help='balls served each round (default: %(default)s)')
+    parser.add_argument('--levels', metavar='FILE',
+                        help='play the levels in a level pack or text file (see levels.py), '
+                             'the next one after every win')
+    parser.add_argument('--level', type=int, default=1,
+                        help='level of --levels to start on (default: %(default)s)')
+    parser.add_argument('--no-particles', action='store_true',
+                        help='don\'t throw debris from hit bricks')
+    parser.add_argument('--rewind', type=float, default=10, metavar='SECONDS',
+                        help='seconds BACKSPACE can rewind, 0 to turn it off (default: %(default)s); '
+                             'not while recording or replaying')
+    parser.add_argument('--record', metavar='FILE',
+                        help='record every step\'s input to FILE')
+    parser.add_argument('--replay', metavar='FILE',
+                        help='play back an input log in real time (python replay.py FILE runs it headless)')
+    parser.add_argument('--profile', metavar='FILE',
+                        help='time every frame and save the samples on exit (.csv, otherwise Chrome trace JSON)')
+    parser.add_argument('--latency', action='store_true',
+                        help='measure touch-to-display latency of the paddle, print it and the configured '
+                             'sound buffer latency on exit')
+    args = parser.parse_args(argv)
+
+    # create the game (wall, paddle and ball)
+    replay = None
+    replayed = 0  # steps of the log played back so far
+    levels = None
+    level_index = 0
+    if args.replay:
+        log = InputLog.load(args.replay)
+        state = log.new_state()
+        replay = log.inputs()
+    else:
+        state = GameState(balls=max(args.balls, 1))
+        if args.levels:
+            try:
+                levels = load_levels(args.levels)
+                level_index = min(max(args.level, 1), len(levels)) - 1
+                levels.level(level_index).apply(state)
+            except (OSError, LevelError, IndexError) as e:
+                print(f"⚠️  Could not load levels from {args.levels}: {e}")
+                levels = None
+    state.subscribe(play_sound)
+    recorder = InputRecorder(args.record, state) if args.record else None
+    if recorder is not None:
+        levels = None  # a log has one starting wall, so recordings stay on this level
+
+    # holding BACKSPACE steps back through the last seconds of play; a log
+    # has no way to record that, so not while recording or replaying
+    rewind = None
+    if args.rewind > 0 and recorder is None and replay is None:
+        rewind = RewindBuffer(args.rewind, sim_rate)
+
+    # draw only what changed each frame
+    renderer = Renderer(screen, font, title_font)
+    state.subscribe(renderer.on_event)
+
+    # debris from hit bricks, drawn over the game each frame
+    particles = None
+    if ParticleSystem is not None and not args.no_particles:
+        particles = ParticleSystem(state.wall)
+        state.subscribe(particles.on_event)
+
+    # frame timings, F3 shows them over the bottom of the touchpad
+    profiler = FrameProfiler(enabled=bool(args.profile))
+    overlay = ProfileOverlay(profiler, (0, screen_height - 70, screen_width, 70),
+                             pygame.font.Font(None, 20))
+
+    # touch-to-display latency, measured from when the pointer is sampled
+    probe = None
+    if args.latency:
+        paddle = state.paddle
+        probe = LatencyProbe(paddle.width // 2, screen_width - paddle.width + paddle.width // 2)
+
+    # only the events the loop handles reach the queue; the pointer is
+    # polled once a frame instead of draining a MOUSEMOTION per move
+    pygame.event.set_blocked(None)
+    pygame.event.set_allowed([pygame.QUIT, pygame.KEYDOWN, pygame.MOUSEBUTTONDOWN, pygame.WINDOWEXPOSED])
+    last_pointer = pygame.mouse.get_pos()
+
+    # physics runs at a fixed rate, rendering as fast as fps allows
+    timestep = FixedTimestep(sim_rate)
+    previous = state.positions()
+    target_x = None
+    start = False
+    first_frame = True
+    report_startup = True
+    idle = False
+
+    run = True
+
+    while run:
+
+        slept = idle  # this frame's clock time includes the wait
+        if idle:
+            # between rounds nothing moves: sleep until an event arrives,
+            # waking every attract_interval to blink the start prompt
+            event = pygame.event.wait(attract_interval)
+            timestep.reset()  # don't catch up on the time spent asleep
+            clock.tick()
+            profiler.begin_frame()
+            events = pygame.event.get()
+            if event.type == pygame.NOEVENT:
+                renderer.blink()
             else:
-                self.speed_x *= -1
-
-        self.rect.x += self.speed_x
-        self.rect.y += self.speed_y
-
-        # Check for ball missing the paddle (game lost condition) against game area height
-        if self.rect.bottom > game_height:
-            self.game_over = -1
-
-        return self.game_over
-
-    def draw(self):
-        pygame.draw.circle(screen, paddle_col, (self.rect.x + self.ball_rad, self.rect.y + self.ball_rad),
-                           self.ball_rad)
-        pygame.draw.circle(screen, paddle_outline, (self.rect.x + self.ball_rad, self.rect.y + self.ball_rad),
-                           self.ball_rad, 3)
-
-    def reset(self, x, y):
-        self.ball_rad = 10
-        self.x = x - self.ball_rad
-        self.y = y
-        self.rect = Rect(self.x, self.y, self.ball_rad * 2, self.ball_rad * 2)
-        self.speed_x = 4
-        self.speed_y = -4
-        self.speed_max = 5
-        self.game_over = 0
-
-# create a wall
-wall = Wall()
-wall.create_wall()
-
-# create paddle
-player_paddle = Paddle()
-
-# create ball
-ball = GameBall(player_paddle.x + (player_paddle.width // 2), player_paddle.y - player_paddle.height)
-
-run = True
-sound_played = False # Flag to ensure game over/win sound plays only once
-
-while run:
-
-    clock.tick(fps)
-
-    screen.fill(bg)
-
-    # draw game area objects
-    wall.draw_wall()
-    player_paddle.draw()
-    ball.draw()
-
-    # draw touchpad zone
-    pygame.draw.rect(screen, touchpad_bg, (0, game_height, screen_width, touchpad_height))
-
-    # Show touchpad instructions ONLY when game is not running
-    if not live_ball:
-        msg = "Touch here to start, move paddle"
-        text_surface = font.render(msg, True, text_col)
-        text_rect = text_surface.get_rect(center=(screen_width // 2,
-                                                game_height + touchpad_height // 2))
-        screen.blit(text_surface, text_rect)
-
-
-    if live_ball:
-        # move paddle via smooth target following
-        player_paddle.move()
-        # move ball
-        game_over = ball.move()
-        if game_over != 0:
-            live_ball = False
-            # Play game over sound when game_over is set to -1 (lost) or 1 (won)
-            if not sound_played:
-                if game_over == -1:
-                    SND_GAMEOVER.play()
-                elif game_over == 1:
-                    SND_WIN.play()
-                sound_played = True
-
-    # print player instructions
-    if not live_ball:
-        if game_over == 0:
-            draw_text_centered('BreakOut 3', title_font, text_col, game_height // 2 + 100)
-        elif game_over == 1:
-            draw_text_centered('YOU WON!', font, text_col, game_height // 2 + 200)
-            draw_text_centered('BreakOut 3', title_font, text_col, game_height // 2 + 100)
-        elif game_over == -1:
-            draw_text_centered('YOU LOST!', font, text_col, game_height // 2 + 200)
-            draw_text_centered('BreakOut 3', title_font, text_col, game_height // 2 + 100)
-
-    # Event handler
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            run = False
-        if event.type == pygame.MOUSEBUTTONDOWN and live_ball == False:
-            live_ball = True
-            ball.reset(player_paddle.x + (player_paddle.width // 2), player_paddle.y - player_paddle.height)
-            player_paddle.reset()
-            wall.create_wall()
-            sound_played = False # Reset the sound flag for the new round
-        # Touchpad control (mouse/touch motion)
-        if event.type == pygame.MOUSEMOTION:
+                events.insert(0, event)
+        else:
+            clock.tick(args.fps)
+            # the frame starts before the event pump, so EVENTS times it
+            profiler.begin_frame()
+            events = pygame.event.get()
+
+        # Event handler
+        for event in events:
+            if event.type == pygame.QUIT:
+                run = False
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                overlay.visible = not overlay.visible
+                profiler.enabled = overlay.visible or bool(args.profile)
+                if not overlay.visible:
+                    renderer.damage(overlay.rect)
+            if event.type == pygame.WINDOWEXPOSED:
+                renderer.invalidate()
+            if event.type == pygame.MOUSEBUTTONDOWN and not state.live_ball:
+                if not start and levels is not None and state.game_over == 1:
+                    # won: the next round is the next level, decoded now
+                    try:
+                        level = levels.level((level_index + 1) % len(levels))
+                    except (LevelError, IndexError) as e:
+                        # a bad level later in the pack; play on with this one
+                        print(f"⚠️  Could not load the next level from {args.levels}: {e}")
+                        levels = None
+                    else:
+                        level_index = (level_index + 1) % len(levels)
+                        level.apply(state)
+                        renderer.invalidate()
+                        if rewind is not None:
+                            rewind.clear()  # snapshots of another wall
+                start = True
+        profiler.mark(EVENTS)
+
+        # -----------------------------------------------------
+        # Keyboard Controls (Left / Right Arrow Keys)
+        # -----------------------------------------------------
+        keys = pygame.key.get_pressed()
+        # Touchpad control: the pointer is sampled once, as late as possible
+        # before the simulation and render, and only a change of position
+        # counts as a touch, so a frame gives at most one paddle command
+        pointer = pygame.mouse.get_pos()
+        if pointer != last_pointer:
+            last_pointer = pointer
             # Only register touches in bottom 200px (touchpad zone)
-            if event.pos[1] >= game_height:
-                player_paddle.set_target(event.pos[0])
-
-            # -----------------------------------------------------
-    # Keyboard Controls (Left / Right Arrow Keys)
-    # -----------------------------------------------------
-    keys = pygame.key.get_pressed()
-
-    if keys[pygame.K_LEFT]:
-        player_paddle.rect.x -= player_paddle.speed
-        player_paddle.target_x = player_paddle.rect.centerx  # keep touch control synced
-
-    if keys[pygame.K_RIGHT]:
-        player_paddle.rect.x += player_paddle.speed
-        player_paddle.target_x = player_paddle.rect.centerx  # keep touch control synced
-
-    # Clamp paddle inside screen
-    if player_paddle.rect.left < 0:
-        player_paddle.rect.left = 0
-    if player_paddle.rect.right > screen_width:
-        player_paddle.rect.right = screen_width
-
-    pygame.display.update()
-
-pygame.quit()
\ No newline at end of file
+            if pointer[1] >= game_height:
+                target_x = pointer[0]
+                if probe is not None and state.live_ball:
+                    probe.command(target_x, state.paddle.rect.centerx)
+        profiler.mark(INPUT)
+
+        # advance the game by however many fixed steps are due; touch and
+        # start are kept until a step has used them
+        rewinding = rewind is not None and keys[pygame.K_BACKSPACE]
+        for _ in range(timestep.advance()):
+            if rewinding:
+                previous = state.positions()
+                bricks = state.wall.snapshot()
+                rewind.rewind(state)
+                renderer.hit_bricks.update(state.wall.diff(bricks))
+                continue
+            if replay is not None:
+                inp = next(replay, None)
+                if inp is None:
+                    run = False
+                    break
+                replayed += 1
+            else:
+                inp = FrameInput(target_x, keys[pygame.K_LEFT], keys[pygame.K_RIGHT], start)
+                target_x = None
+                start = False
+            if recorder is not None:
+                recorder.record(inp)
+            previous = state.positions()
+            state.step(inp)
+            if rewind is not None:
+                rewind.push(state)
+            if particles is not None:
+                particles.update()
+        voices.flush()
+        profiler.mark(PHYSICS)
+
+        if particles is not None and particles.rect is not None:
+            renderer.damage(particles.rect)  # wipe last frame's particles
+        dirty = renderer.draw(state, timestep.alpha, previous)
+        if particles is not None:
+            area = particles.draw(screen)
+            if area is not None:
+                dirty.append(area)
+        if overlay.visible:
+            dirty.append(overlay.draw(screen))
+        profiler.mark(DRAW)
+        pygame.display.update(dirty)
+        profiler.mark(UPDATE)
+        profiler.end_frame()
+        if probe is not None and renderer.paddle_rect is not None:
+            probe.presented(renderer.paddle_rect.centerx)
+        if particles is not None and not slept:
+            particles.budget(clock.get_rawtime() / 1000)
+
+        # this frame is on screen; go idle until something happens unless a
+        # round is running, a key is moving the paddle or rewinding, a replay
+        # is playing or debris is still falling
+        idle = (not state.live_ball and not start and replay is None
+                and not keys[pygame.K_LEFT] and not keys[pygame.K_RIGHT] and not rewinding
+                and not (particles is not None and particles.count))
+
+        if first_frame:
+            startup.mark('first frame')
+            first_frame = False
+        # report once the title screen is up and the sounds are in
+        if report_startup and loader.done.is_set():
+            print(startup.report())
+            report_startup = False
+
+    if args.profile:
+        profiler.export(args.profile)
+    if probe is not None:
+        print(probe.report(Paddle.settle_steps))
+        print(voices.report())
+    if recorder is not None:
+        recorder.close()
+    if replay is not None and log.digest is not None:
+        # only a replay that reached the end can be checked against the footer
+        if replayed != log.steps:
+            print(f"⚠️  Replay stopped at step {replayed} of {log.steps}, nothing to verify")
+        elif state.digest() == log.digest:
+            print("✓ Replay matches the recorded session")
+        else:
+            print("✗ Replay diverged from the recorded session")
+
+    pygame.quit()
+
+
+if __name__ == '__main__':
+    main()
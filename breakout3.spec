@@ -1,13 +1,18 @@
 # -*- mode: python ; coding: utf-8 -*-
+import subprocess
+import sys
+
+# decode the sounds and icon into one memory-mapped pack (see assets.py)
+subprocess.check_call([sys.executable, 'assets.py', 'build', 'assets.pak'], cwd=SPECPATH)
 
 a = Analysis(
     ['breakout3.py'],
     pathex=[],
     binaries=[],
     datas=[
-        ('sounds', 'sounds'),
+        ('assets.pak', '.'),
+        ('fonts', 'fonts'),
         ('breakout3.icns', '.'),
-        ('breakout3.png', '.'),
     ],
     hiddenimports=[],
     hookspath=[],
@@ -30,6 +30,7 @@ APP_DATA_DIR="${SHARE_DIR}/${APP_NAME}"
 echo "Step 1: Cleaning old build files..."
 rm -rf ${BUILD_DIR}
 rm -f ${APP_NAME}_${APP_VERSION}_${ARCH}.deb
+rm -f assets.pak
 
 echo "Step 2: Creating directory structure..."
 mkdir -p ${DEBIAN_DIR}
@@ -48,9 +49,14 @@ if [ ! -f "breakout3.spec" ]; then
     exit 1
 fi
 
-# Build with PyInstaller
+# Build with PyInstaller (the spec also packs the sounds and icon into assets.pak)
 pyinstaller --clean breakout3.spec
 
+if [ ! -f "assets.pak" ]; then
+    echo "Error: asset pack was not built!"
+    exit 1
+fi
+
 if [ ! -f "dist/BreakOut3/BreakOut3" ]; then
     echo "Error: PyInstaller build failed!"
     exit 1
@@ -0,0 +1,285 @@
+# Gym-style environment for training agents on BreakOut3.
+#
+# BreakoutEnv wraps a GameState behind the familiar reset()/step(action)
+# interface (the gymnasium signatures, without depending on gymnasium). An
+# action is held for frame_skip simulation steps and is one of:
+#
+#   keys     (default) 0 stay, 1 left, 2 right, like holding the arrow keys
+#   touch    with target_bins=N, 0 to N-1 touch the touchpad at the centre of
+#            that Nth of the paddle's range: Paddle.set_target(), so the
+#            paddle eases there and its movement puts spin on the ball
+#
+# The observation is one float32 vector:
+#
+#   ball x, ball y, ball speed x, ball speed y, paddle x, then the brick
+#   strengths row by row (0 where there is no brick)
+#
+# in pixels and pixels per step, unscaled. Rewards are hit_reward per brick
+# hit, plus win_reward or loss_reward when the round ends.
+#
+# VectorEnv runs many environments across worker processes. Observations,
+# actions, rewards and done flags live in one shared memory block that the
+# workers write in place, so a step costs one small message per worker and
+# no pickling of observations:
+#
+#   with VectorEnv(64, workers=4) as envs:
+#       obs = envs.reset()
+#       obs, rewards, terminated, truncated, infos = envs.step(actions)
+#
+# "python env.py" measures steps/s with random actions.
+#
+# Requires numpy (pip install numpy); the game itself does not.
+import os
+
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+import argparse
+import multiprocessing
+import sys
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from simulation import GameState, FrameInput, NO_INPUT, BLOCK_HIT, rows, cols, screen_width, paddle_width
+
+STAY, LEFT, RIGHT = range(3)
+action_inputs = (NO_INPUT, FrameInput(left=True), FrameInput(right=True))
+
+
+def target_inputs(bins):
+    """FrameInputs touching the centres of bins equal slices of the range
+    the paddle's centre can reach."""
+    half = paddle_width // 2
+    span = screen_width - paddle_width
+    return tuple(FrameInput(target_x=half + round(span * (n + 0.5) / bins)) for n in range(bins))
+
+
+def observation_size(rows=rows, cols=cols):
+    return 5 + rows * cols
+
+
+class BreakoutEnv:
+    """One BreakOut3 round per episode; every reset() serves a new ball."""
+
+    action_count = len(action_inputs)  # in keys mode
+    hit_reward = 1.0
+    win_reward = 10.0
+    loss_reward = -10.0
+
+    def __init__(self, rows=rows, cols=cols, layout=None, frame_skip=1, max_steps=10000, target_bins=None):
+        self.state = GameState(rows, cols, layout)
+        self.inputs = target_inputs(target_bins) if target_bins else action_inputs
+        self.action_count = len(self.inputs)
+        self.state.subscribe(self._on_event)
+        self.frame_skip = frame_skip
+        self.max_steps = max_steps  # actions per episode before it is truncated
+        self.observation_size = observation_size(rows, cols)
+        self.steps = 0
+        self.hits = 0
+
+    def _on_event(self, event, data):
+        if event == BLOCK_HIT:
+            self.hits += 1
+
+    def observe(self, out=None):
+        """Write the observation into out (or a new array) and return it."""
+        if out is None:
+            out = np.empty(self.observation_size, dtype=np.float32)
+        ball = self.state.ball
+        out[:5] = ball.rect.x, ball.rect.y, ball.speed_x, ball.speed_y, self.state.paddle.rect.x
+        out[5:] = np.frombuffer(self.state.wall.strength, dtype=np.uint8)
+        return out
+
+    def reset(self, seed=None, options=None, out=None):
+        # the game has no randomness, seed is accepted for the interface
+        self.state.start()
+        self.steps = 0
+        return self.observe(out), {}
+
+    def step(self, action, out=None):
+        """Hold action for frame_skip steps; returns (observation, reward,
+        terminated, truncated, info) like gymnasium."""
+        self.hits = 0
+        inp = self.inputs[action]
+        state = self.state
+        game_over = 0
+        for _ in range(self.frame_skip):
+            game_over = state.step(inp)
+            if game_over:
+                break
+        self.steps += 1
+        reward = self.hits * self.hit_reward
+        if game_over == 1:
+            reward += self.win_reward
+        elif game_over == -1:
+            reward += self.loss_reward
+        truncated = not game_over and self.steps >= self.max_steps
+        return self.observe(out), reward, game_over != 0, truncated, {}
+
+
+class _Buffers:
+    """numpy views of the arrays in a VectorEnv's shared memory block."""
+
+    def __init__(self, buf, n, size):
+        offset = 0
+        views = []
+        for dtype, shape in ((np.float32, (n, size)), (np.float32, (n,)), (np.int16, (n,)),
+                             (np.bool_, (n,)), (np.bool_, (n,))):
+            count = int(np.prod(shape))
+            views.append(np.ndarray(shape, dtype=dtype, buffer=buf, offset=offset))
+            offset += count * np.dtype(dtype).itemsize
+            offset = -(-offset // 8) * 8
+        self.observations, self.rewards, self.actions, self.terminated, self.truncated = views
+
+    @staticmethod
+    def nbytes(n, size):
+        total = 0
+        for itemsize, count in ((4, n * size), (4, n), (2, n), (1, n), (1, n)):
+            total = -(-(total + itemsize * count) // 8) * 8
+        return total
+
+
+def _step_envs(envs, buffers, first):
+    # a finished env resets straight away
+    observations = buffers.observations
+    for i, env in enumerate(envs, first):
+        _, reward, terminated, truncated, _ = env.step(int(buffers.actions[i]), observations[i])
+        buffers.rewards[i] = reward
+        buffers.terminated[i] = terminated
+        buffers.truncated[i] = truncated
+        if terminated or truncated:
+            env.reset(out=observations[i])
+
+
+def _worker(conn, name, n, size, first, last, env_kwargs):
+    # steps envs first..last-1, reading actions from and writing results to
+    # the shared block
+    memory = shared_memory.SharedMemory(name=name)
+    buffers = _Buffers(memory.buf, n, size)
+    envs = [BreakoutEnv(**env_kwargs) for _ in range(first, last)]
+    try:
+        while True:
+            command = conn.recv()
+            if command == 'step':
+                _step_envs(envs, buffers, first)
+            elif command == 'reset':
+                for i, env in enumerate(envs, first):
+                    env.reset(out=buffers.observations[i])
+            elif command == 'close':
+                break
+            conn.send(None)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        del buffers
+        memory.close()
+        conn.close()
+
+
+class VectorEnv:
+    """n BreakoutEnvs stepped in parallel by worker processes.
+
+    reset() and step() return the shared arrays themselves, which the next
+    call overwrites; copy them to keep them. An environment whose episode
+    ends is reset in the same step, so its observation is the first of the
+    next episode.
+    """
+
+    def __init__(self, n, workers=None, **env_kwargs):
+        self.n = n
+        self.workers = max(1, min(workers or os.cpu_count() or 1, n))
+        self.observation_size = observation_size(env_kwargs.get('rows', rows), env_kwargs.get('cols', cols))
+        self.action_count = env_kwargs.get('target_bins') or len(action_inputs)
+        self.memory = shared_memory.SharedMemory(create=True, size=_Buffers.nbytes(n, self.observation_size))
+        self.buffers = _Buffers(self.memory.buf, n, self.observation_size)
+        self.connections = []
+        self.processes = []
+        bounds = np.linspace(0, n, self.workers + 1).astype(int)
+        for first, last in zip(bounds, bounds[1:]):
+            parent, child = multiprocessing.Pipe()
+            process = multiprocessing.Process(
+                target=_worker, daemon=True,
+                args=(child, self.memory.name, n, self.observation_size, int(first), int(last), env_kwargs))
+            process.start()
+            child.close()
+            self.connections.append(parent)
+            self.processes.append(process)
+
+    def _broadcast(self, command):
+        for connection in self.connections:
+            connection.send(command)
+        for connection in self.connections:
+            connection.recv()
+
+    def reset(self):
+        self._broadcast('reset')
+        return self.buffers.observations
+
+    def step(self, actions):
+        """Step every env with its action; returns (observations, rewards,
+        terminated, truncated, infos)."""
+        self.buffers.actions[:] = actions
+        self._broadcast('step')
+        buffers = self.buffers
+        return buffers.observations, buffers.rewards, buffers.terminated, buffers.truncated, {}
+
+    def close(self):
+        if self.memory is None:
+            return
+        for connection in self.connections:
+            try:
+                connection.send('close')
+            except (BrokenPipeError, OSError):
+                pass
+        for process in self.processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        self.buffers = None
+        self.memory.close()
+        self.memory.unlink()
+        self.memory = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Measure BreakOut3 environment throughput.')
+    parser.add_argument('--envs', type=int, default=64, help='environments (default: %(default)s)')
+    parser.add_argument('--workers', type=int, help='worker processes (default: one per CPU)')
+    parser.add_argument('--steps', type=int, default=1000, help='vector steps to time (default: %(default)s)')
+    parser.add_argument('--frame-skip', type=int, default=1)
+    parser.add_argument('--target-bins', type=int, help='touch actions instead of keys, this many targets')
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(0)
+    env_kwargs = {'frame_skip': args.frame_skip, 'target_bins': args.target_bins}
+    env = BreakoutEnv(**env_kwargs)
+    env.reset()
+    began = time.perf_counter()
+    for _ in range(args.steps):
+        _, _, terminated, truncated, _ = env.step(int(rng.integers(env.action_count)))
+        if terminated or truncated:
+            env.reset()
+    single = args.steps / (time.perf_counter() - began)
+    print(f"{'1 env, in process:':<32}{single:>12,.0f} steps/s")
+
+    with VectorEnv(args.envs, args.workers, **env_kwargs) as envs:
+        envs.reset()
+        actions = rng.integers(env.action_count, size=(args.steps, args.envs), dtype=np.int16)
+        began = time.perf_counter()
+        for step_actions in actions:
+            envs.step(step_actions)
+        elapsed = time.perf_counter() - began
+        label = f'{args.envs} envs on {envs.workers} workers:'
+        print(f"{label:<32}{args.steps * args.envs / elapsed:>12,.0f} steps/s")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,161 @@
+# Offline export of recorded BreakOut3 sessions to PNG frames or raw video.
+#
+# A recording (see replay.py) is re-run headless and drawn by the game's
+# Renderer onto an off-screen Surface, one frame per simulation step, with
+# no window and no audio. The steps are split into contiguous chunks shared
+# out to worker processes. The parent first runs the log once without
+# drawing, which is fast, and takes a GameState.snapshot() at the start of
+# every chunk; a worker restores its chunk's snapshot and only draws its own
+# frames. Every worker streams its frames straight to disk:
+#
+#   --png DIR    frame_000000.png, frame_000001.png, ... in DIR
+#   --raw FILE   every frame's RGB24 pixels back to back, each worker
+#                writing at its chunk's offset; play or encode it with e.g.
+#                ffmpeg -f rawvideo -pix_fmt rgb24 -s 650x850 -r 60 -i FILE out.mp4
+#
+# --start/--end pick the steps to export, for clips, and --every N keeps
+# every Nth frame. Debris particles are left out, they aren't part of the
+# recorded state.
+#
+#   python export.py session.bo3r --png frames/
+import os
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+import argparse
+import itertools
+import multiprocessing
+import sys
+import time
+
+import pygame
+
+import fontcache
+from simulation import screen_width, screen_height
+from render import Renderer
+from replay import InputLog, ReplayError
+from timestep import sim_rate
+
+frame_size = screen_width * screen_height * 3  # bytes of one RGB24 frame
+
+
+def chunk_snapshots(log, start, end, chunks):
+    """Run log up to end and return (first step, snapshot, inputs) for
+    chunks contiguous chunks of start..end, each snapshot taken before the
+    chunk's first step and inputs the FrameInputs of its steps."""
+    bounds = sorted({start + (end - start) * n // chunks for n in range(chunks + 1)})
+    state = log.new_state()
+    step = state.step
+    inputs = log.inputs()
+    for inp in itertools.islice(inputs, start):
+        step(inp)
+    tasks = []
+    for first, last in zip(bounds, bounds[1:]):
+        chunk = list(itertools.islice(inputs, last - first))
+        tasks.append((first, state.snapshot(), chunk))
+        for inp in chunk:
+            step(inp)
+    return tasks
+
+
+def _open_fonts(font_path):
+    pygame.font.init()
+    return pygame.font.Font(font_path, 30), pygame.font.Font(font_path, 75)
+
+
+def _export_chunk(task):
+    # worker: draw and write the frames of one chunk; returns (first step,
+    # frames written)
+    path, font_path, first, snapshot, inputs, start, every, png_dir, raw_path = task
+    state = InputLog.load(path).new_state()
+    state.restore(snapshot)
+    surface = pygame.Surface((screen_width, screen_height))
+    renderer = Renderer(surface, *_open_fonts(font_path))
+    state.subscribe(renderer.on_event)
+
+    # frame n of the export is step start + n * every
+    frame = -(-(first - start) // every)
+    raw = None
+    if raw_path is not None:
+        raw = open(raw_path, 'r+b')
+        raw.seek(frame * frame_size)
+    written = 0
+    try:
+        for n, inp in enumerate(inputs, first):
+            state.step(inp)
+            if (n - start) % every:
+                continue
+            renderer.draw(state)
+            if raw is not None:
+                raw.write(pygame.image.tobytes(surface, 'RGB'))
+            else:
+                pygame.image.save(surface, os.path.join(png_dir, f'frame_{frame:06d}.png'))
+            frame += 1
+            written += 1
+    finally:
+        if raw is not None:
+            raw.close()
+    return first, written
+
+
+def export(path, png_dir=None, raw_path=None, start=0, end=None, every=1, workers=None):
+    """Export the frames of steps start..end of the log at path; returns
+    (frames, steps in the log)."""
+    log = InputLog.load(path)
+    steps = log.steps if log.steps is not None else sum(1 for _ in log.inputs())
+    end = steps if end is None else min(end, steps)
+    start = min(max(start, 0), end)
+    workers = max(1, workers or os.cpu_count() or 1)
+    frames = -(-(end - start) // every)
+    # a few chunks per worker, so one slow chunk doesn't hold up the rest
+    tasks = chunk_snapshots(log, start, end, min(workers * 4, max(end - start, 1)))
+
+    if png_dir is not None:
+        os.makedirs(png_dir, exist_ok=True)
+    if raw_path is not None:
+        with open(raw_path, 'wb') as f:
+            f.truncate(frames * frame_size)
+
+    bundled = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fonts', 'freesansbold.ttf')
+    font_path = fontcache.resolve('Impact', bundled)
+    jobs = [(path, font_path, first, snapshot, inputs, start, every, png_dir, raw_path)
+            for first, snapshot, inputs in tasks]
+    written = 0
+    with multiprocessing.Pool(workers) as pool:
+        for _, count in pool.imap_unordered(_export_chunk, jobs):
+            written += count
+    return written, steps
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Export a BreakOut3 input log to PNG frames or raw video.')
+    parser.add_argument('log', help='input log written by breakout3.py --record')
+    output = parser.add_mutually_exclusive_group(required=True)
+    output.add_argument('--png', metavar='DIR', help='write one PNG per frame to DIR')
+    output.add_argument('--raw', metavar='FILE', help=f'write RGB24 {screen_width}x{screen_height} frames to FILE')
+    parser.add_argument('--start', type=int, default=0, help='first step to export (default: %(default)s)')
+    parser.add_argument('--end', type=int, help='step to stop before (default: the end of the log)')
+    parser.add_argument('--every', type=int, default=1, help='keep every Nth frame (default: %(default)s)')
+    parser.add_argument('--workers', type=int, help='worker processes (default: one per CPU)')
+    args = parser.parse_args(argv)
+
+    began = time.perf_counter()
+    try:
+        frames, steps = export(args.log, args.png, args.raw, args.start, args.end, max(args.every, 1), args.workers)
+    except (OSError, ReplayError) as e:
+        print(f"✗ {e}")
+        return 1
+    elapsed = time.perf_counter() - began
+    seconds = frames * max(args.every, 1) / sim_rate
+    print(f"✓ Exported {frames} frames ({seconds:.1f}s of play) in {elapsed:.2f}s, "
+          f"{frames / max(elapsed, 1e-9):.0f} frames/s, {seconds / max(elapsed, 1e-9):.1f}x real time")
+    if args.raw:
+        print(f"  ffmpeg -f rawvideo -pix_fmt rgb24 -s {screen_width}x{screen_height} "
+              f"-r {sim_rate / max(args.every, 1):g} -i {args.raw} out.mp4")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
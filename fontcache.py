@@ -0,0 +1,146 @@
+# Font lookup for BreakOut3 without a system font scan on every launch.
+#
+# pygame.font.SysFont() builds its table of installed fonts the first time it
+# is called, which on Linux means running fc-list over every font on the
+# system and on Windows walking the registry; that is most of the game's
+# startup time. resolve() does the lookup once and remembers which file a font
+# name resolved to in a small JSON file in the user's cache directory. Each
+# entry is keyed by the font name and a fingerprint of the font directories
+# (and the folders directly inside them), the fontconfig settings and
+# fontconfig's own caches, which fc-cache rewrites on every install, so
+# installing or removing fonts triggers a fresh lookup. Later launches load
+# the TTF straight by path. A font that wasn't found is looked up again
+# after negative_ttl anyway, in case a change slipped past the fingerprint.
+#
+# Fonts that are not installed fall back to the copy bundled in fonts/, and
+# to pygame's default font if that is missing too.
+import json
+import os
+import sys
+import time
+import zlib
+
+import pygame
+
+CACHE_VERSION = 2
+negative_ttl = 7 * 24 * 3600  # seconds a "not installed" answer is trusted
+
+
+def cache_dir():
+    if sys.platform == 'darwin':
+        return os.path.expanduser('~/Library/Caches/BreakOut3')
+    if sys.platform == 'win32':
+        base = os.environ.get('LOCALAPPDATA') or os.path.expanduser('~\\AppData\\Local')
+        return os.path.join(base, 'BreakOut3', 'Cache')
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache')
+    return os.path.join(base, 'breakout3')
+
+
+cache_path = os.path.join(cache_dir(), 'fonts.json')
+
+
+def load_json(path):
+    """The JSON object in the cache file at path, or {} if it is missing,
+    unreadable or not an object."""
+    try:
+        with open(path) as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def save_json(path, data, indent=None):
+    """Write data to the cache file at path, through a temporary file
+    that is renamed so a crash can't leave half a cache."""
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp = path + '.tmp'
+        with open(temp, 'w') as f:
+            json.dump(data, f, indent=indent)
+        os.replace(temp, path)
+    except OSError:
+        pass  # a read-only home just means doing the work again next launch
+
+
+def _font_dirs():
+    # the places a font install or fontconfig change shows up as a new mtime
+    if sys.platform == 'darwin':
+        return ['/System/Library/Fonts', '/Library/Fonts', os.path.expanduser('~/Library/Fonts')]
+    if sys.platform == 'win32':
+        windir = os.environ.get('WINDIR', 'C:\\Windows')
+        local = os.environ.get('LOCALAPPDATA', '')
+        return [os.path.join(windir, 'Fonts'), os.path.join(local, 'Microsoft', 'Windows', 'Fonts')]
+    data_home = os.environ.get('XDG_DATA_HOME') or os.path.expanduser('~/.local/share')
+    cache_home = os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache')
+    return ['/etc/fonts', '/etc/fonts/conf.d', '/usr/share/fonts', '/usr/local/share/fonts',
+            os.path.join(data_home, 'fonts'), os.path.expanduser('~/.fonts'),
+            os.environ.get('FONTCONFIG_FILE', ''), os.environ.get('FONTCONFIG_PATH', ''),
+            '/var/cache/fontconfig', os.path.join(cache_home, 'fontconfig')]
+
+
+def _subdirs(path):
+    # fonts usually go into a folder of their own, which only changes the
+    # mtime of its parent, e.g. /usr/share/fonts/truetype/
+    try:
+        with os.scandir(path) as entries:
+            return sorted(entry.path for entry in entries if entry.is_dir(follow_symlinks=False))
+    except OSError:
+        return []
+
+
+def fingerprint():
+    """CRC of the mtimes of the font directories and the folders directly
+    inside them, the platform and pygame version."""
+    parts = [sys.platform, pygame.version.ver]
+    for top in filter(None, _font_dirs()):
+        for path in [top] + _subdirs(top):
+            try:
+                parts.append(f'{path}:{os.stat(path).st_mtime_ns}')
+            except OSError:
+                parts.append(f'{path}:-')  # a directory appearing counts as a change too
+    return zlib.crc32('\n'.join(parts).encode())
+
+
+def _load_cache():
+    cache = load_json(cache_path)
+    if cache.get('version') != CACHE_VERSION:
+        return {}
+    return cache.get('fonts', {})
+
+
+def _save_cache(fonts):
+    save_json(cache_path, {'version': CACHE_VERSION, 'fonts': fonts}, indent=1)
+
+
+def resolve(name, bundled=None):
+    """Path of the font file for the system font name, bundled if the font
+    is not installed, or None for pygame's default font."""
+    key = name.lower().replace(' ', '')
+    stamp = fingerprint()
+    fonts = _load_cache()
+    entry = fonts.get(key)
+    now = time.time()
+    if entry is not None and entry.get('fingerprint') == stamp:
+        path = entry.get('path')
+        if path is not None and os.path.exists(path):
+            return path
+        if path is None and now - entry.get('checked', 0) < negative_ttl:
+            return _fallback(bundled)
+
+    path = pygame.font.match_font(name)  # the slow part: scans the system fonts
+    fonts[key] = {'fingerprint': stamp, 'path': path, 'checked': now}
+    _save_cache(fonts)
+    return path or _fallback(bundled)
+
+
+def _fallback(bundled):
+    if bundled is not None and os.path.exists(bundled):
+        return bundled
+    return None
+
+
+def load_font(name, size, bundled=None):
+    """pygame.font.Font for name at size, like SysFont(name, size) but
+    resolved through the cache."""
+    return pygame.font.Font(resolve(name, bundled), size)
@@ -0,0 +1,223 @@
+# Procedural level generator for BreakOut3.
+#
+# generate_layout() makes a left-right symmetric brick layout for a
+# difficulty from 1 to 10: harder levels have more bricks and stronger ones.
+# Every candidate is then played headless with a scripted paddle through the
+# real GameState physics (GameBall.move), and only levels the script wins
+# are kept. The script follows the ball and moves its aim to the next of
+# aim_offsets after every paddle hit, so the paddle's spin keeps changing
+# the ball's angle.
+#
+# Everything is deterministic, so a play can stop early: it is winnable the
+# moment the wall is cleared, and stuck for good as soon as the ball and
+# wall are back in a state already seen at a paddle hit with the script at
+# the same aim, as the same bounces would follow forever. Those states are
+# compared by the hash of GameState.snapshot().
+#
+# Candidates are verified across a process pool. Results are remembered in
+# levelgen.json in the cache directory (see fontcache.py), keyed by a hash of
+# the layout and the verifier settings, so running the generator again with
+# the same seed re-uses them instead of playing them again:
+#
+#   python levelgen.py --count 20 --difficulty 6 --output generated.bo3l
+#
+# It prints how many levels were verified per minute per core.
+import os
+
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+import argparse
+import hashlib
+import multiprocessing
+import random
+import sys
+import time
+
+from simulation import GameState, FrameInput, PADDLE_HIT, rows, cols
+from levels import Level, LevelError, write_pack, default_brick_height
+from fontcache import cache_dir, load_json, save_json
+from timestep import sim_rate
+
+VERIFY_VERSION = 1  # bump when the script or the physics changes, it voids the cache
+cache_path = os.path.join(cache_dir(), 'levelgen.json')
+
+aim_offsets = (0, 24, -24, 12, -36, 36, -12)  # px from the ball's centre
+steps_per_hit = 600  # steps allowed per point of brick strength before giving up
+
+WON = 'won'        # the script cleared the wall
+CYCLE = 'cycle'    # the ball is stuck repeating the same bounces
+LOST = 'lost'      # the script missed the ball
+TIMEOUT = 'timeout'
+
+
+def generate_layout(rows, cols, difficulty, rng):
+    """Row-major strengths of a symmetric layout for difficulty 1-10."""
+    difficulty = min(max(difficulty, 1), 10)
+    density = 0.3 + 0.06 * difficulty
+    strongest = 1 + difficulty // 3
+    half = (cols + 1) // 2
+    strength = bytearray(rows * cols)
+    for row in range(rows):
+        for col in range(half):
+            if rng.random() < density:
+                # stronger bricks are more likely nearer the top
+                value = 1 + int(rng.random() ** (1 + row / rows) * strongest)
+                strength[row * cols + col] = strength[row * cols + cols - 1 - col] = min(value, strongest)
+    if not any(strength):
+        strength[cols // 2] = 1
+    return bytes(strength)
+
+
+def layout_key(rows, cols, height, layout):
+    """Cache key of a layout under the current verifier settings."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr((VERIFY_VERSION, rows, cols, height, aim_offsets, steps_per_hit)).encode())
+    digest.update(layout)
+    return digest.hexdigest()
+
+
+def verify(rows, cols, height, layout):
+    """Play the layout with the scripted paddle; returns (result, steps)
+    with result WON, CYCLE, LOST or TIMEOUT. Play goes on for at most
+    steps_per_hit steps for every hit the wall takes to clear."""
+    max_steps = steps_per_hit * sum(layout)
+    state = GameState(rows, cols, layout, brick_height=height)
+    hits = []
+    state.subscribe(lambda event, data: event == PADDLE_HIT and hits.append(True))
+    state.start()
+    seen = set()
+    aim = 0
+    step = state.step
+    for steps in range(1, max_steps + 1):
+        game_over = step(FrameInput(target_x=state.ball.rect.centerx + aim_offsets[aim]))
+        if game_over:
+            return (WON if game_over == 1 else LOST), steps
+        if hits:
+            hits.clear()
+            aim = (aim + 1) % len(aim_offsets)
+            key = hash((aim, state.snapshot()))
+            if key in seen:
+                return CYCLE, steps
+            seen.add(key)
+    return TIMEOUT, max_steps
+
+
+def _verify_task(task):
+    # pool worker: (n, rows, cols, height, layout) -> (n, result, steps)
+    n, rows, cols, height, layout = task
+    return (n, *verify(rows, cols, height, layout))
+
+
+class Generator:
+    """Generates and verifies levels until count are winnable.
+
+    Candidate n of a run is made from random.Random(f'{seed}:{n}'), so a run
+    with the same settings makes the same candidates and finds them all in
+    the cache.
+    """
+
+    def __init__(self, rows=rows, cols=cols, difficulty=5, seed=0, workers=None, use_cache=True):
+        if rows < 1 or cols < 1:
+            raise LevelError(f'a level needs at least one row and column, not {rows}x{cols}')
+        self.rows = rows
+        self.cols = cols
+        self.height = default_brick_height(rows)
+        Level('Generated level', rows, cols, bytes(rows * cols), self.height)  # raises LevelError for a wall that can't fit
+        self.difficulty = difficulty
+        self.seed = seed
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.cache = load_json(cache_path) if use_cache else None
+        self.verified = 0     # candidates played this run
+        self.cached = 0       # candidates answered by the cache
+        self.results = {}     # result -> count
+        self.clear_steps = []  # steps the script took to win each level returned
+        self.elapsed = 0.0
+
+    def candidate(self, n):
+        rng = random.Random(f'{self.seed}:{n}')
+        return generate_layout(self.rows, self.cols, self.difficulty, rng)
+
+    def run(self, count, max_candidates=None):
+        """Return up to count winnable Levels, in candidate order."""
+        max_candidates = max_candidates or count * 50
+        began = time.perf_counter()
+        found = {}  # n -> (layout, steps)
+        batch = self.workers * 4
+        with multiprocessing.Pool(self.workers) as pool:
+            first = 0
+            while len(found) < count and first < max_candidates:
+                last = min(first + batch, max_candidates)
+                tasks = []
+                for n in range(first, last):
+                    layout = self.candidate(n)
+                    key = layout_key(self.rows, self.cols, self.height, layout)
+                    known = self.cache.get(key) if self.cache is not None else None
+                    if known is not None:
+                        self.cached += 1
+                        self._record(found, n, layout, *known)
+                    else:
+                        tasks.append((n, self.rows, self.cols, self.height, layout))
+                first = last
+                layouts = {task[0]: task[4] for task in tasks}
+                for i, result, steps in pool.imap_unordered(_verify_task, tasks):
+                    self.verified += 1
+                    if self.cache is not None:
+                        self.cache[layout_key(self.rows, self.cols, self.height, layouts[i])] = [result, steps]
+                    self._record(found, i, layouts[i], result, steps)
+        self.elapsed = time.perf_counter() - began
+        if self.cache is not None:
+            save_json(cache_path, self.cache)
+        levels = []
+        self.clear_steps = []
+        for i in sorted(found)[:count]:
+            layout, steps = found[i]
+            levels.append(Level(f'Generated {self.difficulty}-{i}', self.rows, self.cols, layout, self.height))
+            self.clear_steps.append(steps)
+        return levels
+
+    def _record(self, found, n, layout, result, steps):
+        self.results[result] = self.results.get(result, 0) + 1
+        if result == WON:
+            found[n] = (layout, steps)
+
+    def throughput(self):
+        """Levels played per minute per worker."""
+        if not self.elapsed:
+            return 0.0
+        return self.verified / (self.elapsed / 60) / self.workers
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Generate BreakOut3 levels the scripted paddle can win.')
+    parser.add_argument('--count', type=int, default=10, help='levels to generate (default: %(default)s)')
+    parser.add_argument('--difficulty', type=int, default=5, help='1 to 10 (default: %(default)s)')
+    parser.add_argument('--rows', type=int, default=rows)
+    parser.add_argument('--cols', type=int, default=cols)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, help='worker processes (default: one per CPU)')
+    parser.add_argument('--no-cache', action='store_true', help='play every candidate, even known ones')
+    parser.add_argument('--output', default='generated.bo3l', help='level pack to write (default: %(default)s)')
+    args = parser.parse_args(argv)
+
+    try:
+        generator = Generator(args.rows, args.cols, args.difficulty, args.seed, args.workers, not args.no_cache)
+        levels = generator.run(args.count)
+    except LevelError as e:
+        print(f"✗ {e}")
+        return 1
+    results = ', '.join(f'{count} {result}' for result, count in sorted(generator.results.items()))
+    print(f"{generator.verified} played and {generator.cached} from the cache in {generator.elapsed:.2f}s "
+          f"({results})")
+    if generator.verified:
+        print(f"{generator.throughput():,.0f} levels verified per minute per core on {generator.workers} workers")
+    if not levels:
+        print("✗ No winnable level found")
+        return 1
+    write_pack(args.output, levels)
+    clear = sorted(generator.clear_steps)[len(levels) // 2] / sim_rate
+    print(f"✓ Wrote {len(levels)} levels to {args.output}, the script clears half of them within {clear:.0f}s")
+    return 0 if len(levels) == args.count else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
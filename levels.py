@@ -0,0 +1,286 @@
+# Levels for BreakOut3: a binary level pack and a text form to write them in.
+#
+# A level is a grid of bricks of any size up to screen_width columns, a
+# strength per brick (0 is no brick) and the brick height. Bricks are
+# screen_width // cols px wide from the left, so column counts that leave a
+# strip at the right wide enough for the ball are refused. A pack holds any
+# number of levels:
+#
+#   header   magic b'BO3L', version, level count
+#   index    one fixed-size entry per level: name, offset, size, rows, cols,
+#            brick height
+#   data     each level's row-major strengths, zlib-compressed; empty cells
+#            compress to almost nothing, so sparse layouts stay small
+#
+# The pack is memory-mapped and index entry n sits at a fixed offset, so
+# opening a pack reads only the header and entering a level reads its one
+# entry and decompresses its bricks, however many levels the pack holds.
+# The decompressed strengths go straight to Wall.create_wall() as bytes.
+#
+# The text form has a "level:" line per level, optional "size:" and
+# "brick height:" lines, then one line per row of bricks: a digit 1-9 is
+# a brick of that strength, '.' is no brick. Rows and columns left out are
+# empty, and lines starting with '#' are comments:
+#
+#   level: Classic
+#   333333
+#   333333
+#   222222
+#
+#   level: Sparse
+#   size: 40x65
+#   brick height: 10
+#   ..3...3...3
+#
+# "python levels.py build levels.txt levels.bo3l" packs a text file, "list"
+# shows a pack's index and "text" turns a pack back into text. The game
+# takes either with --levels.
+import argparse
+import mmap
+import struct
+import sys
+import zlib
+
+from simulation import GameState, GameBall, screen_width, game_height, brick_height
+
+MAGIC = b'BO3L'
+VERSION = 1
+HEADER = struct.Struct('<4sHI')
+ENTRY = struct.Struct('<32sQIHHH')
+
+max_wall_height = game_height - 150  # keep the wall clear of where the ball is served
+ball_size = GameBall(0, 0).rect.width
+
+
+class LevelError(Exception):
+    pass
+
+
+def default_brick_height(rows):
+    # the classic 50 px, shrunk so big walls fit in the top half
+    return max(min(brick_height, game_height // 2 // max(rows, 1)), 1)
+
+
+class Level:
+    """One level: its name, grid size, brick height and row-major strengths."""
+
+    def __init__(self, name, rows, cols, strength, brick_height=None):
+        self.name = name
+        self.rows = rows
+        self.cols = cols
+        self.brick_height = brick_height or default_brick_height(rows)
+        self.strength = bytes(strength)
+        if not 1 <= cols <= screen_width or rows < 1:
+            raise LevelError(f'{name}: a level is 1 to {screen_width} columns wide, not {rows}x{cols}')
+        # bricks are screen_width // cols wide, so the last column ends
+        # short of the right side; the ball mustn't fit up that strip
+        gap = screen_width % cols
+        if gap >= ball_size:
+            raise LevelError(f'{name}: {cols} columns leave a {gap} px gap at the right the ball fits through; '
+                             f'use a column count that divides {screen_width} more evenly')
+        if len(self.strength) != rows * cols:
+            raise LevelError(f'{name}: {len(self.strength)} bricks for a {rows}x{cols} grid')
+        if rows * self.brick_height > max_wall_height:
+            raise LevelError(f'{name}: {rows} rows of {self.brick_height} px bricks are taller '
+                             f'than {max_wall_height} px')
+
+    def apply(self, state):
+        """Make this the wall state plays; its next start() serves on it."""
+        state.set_layout(self.rows, self.cols, self.strength, self.brick_height)
+
+    def new_state(self, balls=1):
+        return GameState(self.rows, self.cols, layout=self.strength, balls=balls, brick_height=self.brick_height)
+
+
+class LevelPack:
+    """A memory-mapped level pack; level(n) decodes the nth level."""
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self.map) < HEADER.size:
+            raise LevelError('not a BreakOut3 level pack')
+        magic, version, self.count = HEADER.unpack_from(self.map)
+        if magic != MAGIC:
+            raise LevelError('not a BreakOut3 level pack')
+        if version != VERSION:
+            raise LevelError(f'unsupported level pack version {version}')
+        if HEADER.size + self.count * ENTRY.size > len(self.map):
+            raise LevelError('level pack is truncated')
+
+    def __len__(self):
+        return self.count
+
+    def entry(self, n):
+        """(name, offset, size, rows, cols, brick height) of level n."""
+        if not 0 <= n < self.count:
+            raise IndexError('level index out of range')
+        name, *fields = ENTRY.unpack_from(self.map, HEADER.size + n * ENTRY.size)
+        return (name.rstrip(b'\0').decode(), *fields)
+
+    def level(self, n):
+        name, offset, size, rows, cols, height = self.entry(n)
+        if offset + size > len(self.map):
+            raise LevelError(f'{name}: level pack is truncated')
+        try:
+            strength = zlib.decompress(self.map[offset:offset + size])
+        except zlib.error as e:
+            raise LevelError(f'{name}: {e}') from None
+        return Level(name, rows, cols, strength, height)
+
+    def close(self):
+        self.map.close()
+
+
+class LevelList:
+    """Levels already in memory, e.g. parsed from text, with LevelPack's
+    interface."""
+
+    def __init__(self, levels):
+        self.levels = list(levels)
+
+    def __len__(self):
+        return len(self.levels)
+
+    def level(self, n):
+        return self.levels[n]
+
+    def close(self):
+        pass
+
+
+def write_pack(path, levels):
+    """Write levels as a level pack."""
+    levels = list(levels)
+    offset = HEADER.size + len(levels) * ENTRY.size
+    index = []
+    blobs = []
+    for level in levels:
+        name = level.name.encode()
+        if len(name) > 32:
+            raise LevelError(f'level name {level.name} is longer than 32 bytes')
+        blob = zlib.compress(level.strength, 9)
+        index.append(ENTRY.pack(name, offset, len(blob), level.rows, level.cols, level.brick_height))
+        blobs.append(blob)
+        offset += len(blob)
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(levels)))
+        f.write(b''.join(index))
+        f.write(b''.join(blobs))
+
+
+def parse_text(text):
+    """The levels written in the text form."""
+    levels = []
+    current = None
+
+    def finish():
+        if current is None:
+            return
+        name, size, height, grid = current
+        width = max((len(line) for line in grid), default=0)
+        rows, cols = size or (len(grid), width)
+        if len(grid) > rows or width > cols:
+            raise LevelError(f'{name}: bricks outside its {rows}x{cols} size')
+        strength = bytearray(rows * cols)
+        for row, line in enumerate(grid):
+            for col, char in enumerate(line):
+                if char.isdigit():
+                    strength[row * cols + col] = int(char)
+                elif char != '.':
+                    raise LevelError(f'{name}: {char!r} is not a brick strength or "."')
+        levels.append(Level(name, rows, cols, strength, height))
+
+    for number, raw in enumerate(text.splitlines(), 1):
+        line = raw.strip()
+        if not line or line.startswith('#'):
+            continue
+        key, colon, value = line.partition(':')
+        key = key.strip().lower()
+        value = value.strip()
+        if colon and key == 'level':
+            finish()
+            current = [value or f'Level {len(levels) + 1}', None, None, []]
+        elif current is None:
+            raise LevelError(f'line {number}: expected "level:" before the level')
+        elif colon and key == 'size':
+            try:
+                rows, cols = (int(n) for n in value.lower().split('x'))
+            except ValueError:
+                raise LevelError(f'line {number}: size is rows x cols, e.g. 6x6') from None
+            current[1] = (rows, cols)
+        elif colon and key == 'brick height':
+            try:
+                current[2] = int(value)
+            except ValueError:
+                raise LevelError(f'line {number}: brick height is a number of pixels') from None
+        elif colon:
+            raise LevelError(f'line {number}: unknown setting {key!r}')
+        else:
+            current[3].append(line)
+    finish()
+    return levels
+
+
+def format_text(levels):
+    """Levels in the text form; parse_text() reads it back. The text form
+    only has digits, strengths over 9 are written as 9."""
+    lines = []
+    for level in levels:
+        lines.append(f'level: {level.name}')
+        lines.append(f'size: {level.rows}x{level.cols}')
+        if level.brick_height != default_brick_height(level.rows):
+            lines.append(f'brick height: {level.brick_height}')
+        for row in range(level.rows):
+            cells = level.strength[row * level.cols:(row + 1) * level.cols]
+            line = ''.join(str(min(value, 9)) if value else '.' for value in cells).rstrip('.')
+            lines.append(line or '.')
+        lines.append('')
+    return '\n'.join(lines)
+
+
+def load_levels(path):
+    """A LevelPack for a binary pack, or a LevelList for a text file."""
+    with open(path, 'rb') as f:
+        binary = f.read(len(MAGIC)) == MAGIC
+    if binary:
+        return LevelPack(path)
+    with open(path, encoding='utf-8') as f:
+        return LevelList(parse_text(f.read()))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Build, list or print BreakOut3 level packs.')
+    commands = parser.add_subparsers(dest='command', required=True)
+    build = commands.add_parser('build', help='pack a text file of levels')
+    build.add_argument('source')
+    build.add_argument('output')
+    listing = commands.add_parser('list', help='show the index of a pack')
+    listing.add_argument('pack')
+    text = commands.add_parser('text', help='print a pack in the text form')
+    text.add_argument('pack')
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == 'build':
+            with open(args.source, encoding='utf-8') as f:
+                levels = parse_text(f.read())
+            write_pack(args.output, levels)
+            print(f"✓ Packed {len(levels)} levels into {args.output}")
+            return 0
+        if args.command == 'list':
+            pack = LevelPack(args.pack)
+            for n in range(len(pack)):
+                name, offset, size, rows, cols, height = pack.entry(n)
+                print(f"{n + 1:>4} {name:<32} {rows:>4}x{cols:<4} {height:>3} px {size:>10,} bytes")
+        else:
+            pack = load_levels(args.pack)
+            print(format_text(pack.level(n) for n in range(len(pack))), end='')
+        return 0
+    except (OSError, LevelError) as e:
+        print(f"✗ {e}")
+        return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,138 @@
+# Brick debris particles for BreakOut3.
+#
+# Every hit brick throws out a burst of small squares in its colour that fall
+# under gravity. All particles live in fixed-capacity NumPy arrays, so
+# spawning doesn't allocate, update() moves every one of them with a handful
+# of array operations and draw() hands them to one Surface.blits call. They
+# are purely cosmetic and never touch the GameState, so recordings replay the
+# same with or without them.
+#
+# How many may be alive adapts to the frame time: a frame over budget cuts
+# the limit and culls the particles closest to dying, and the limit creeps
+# back up while frames are cheap.
+#
+# Requires numpy (pip install numpy); without it the game runs without
+# particles.
+import numpy as np
+import pygame
+
+from simulation import BLOCK_HIT, screen_width, game_height
+from render import brick_colour, _display_format
+from profiler import frame_budget
+
+
+class ParticleSystem:
+    """Up to capacity particles; subscribe on_event to a GameState to get a
+    burst for every brick hit in wall."""
+
+    size = 4          # particles are size x size squares
+    gravity = 0.3     # px per step per step
+    lifetime = 45     # steps a particle lives at most
+    per_burst = 12
+
+    def __init__(self, wall=None, capacity=2048, seed=None):
+        self.wall = wall
+        self.capacity = capacity
+        self.limit = capacity  # lowered while frames run over budget
+        self.count = 0
+        self.x = np.zeros(capacity, dtype=np.float32)
+        self.y = np.zeros(capacity, dtype=np.float32)
+        self.vx = np.zeros(capacity, dtype=np.float32)
+        self.vy = np.zeros(capacity, dtype=np.float32)
+        self.life = np.zeros(capacity, dtype=np.int16)
+        self.colour = np.zeros(capacity, dtype=np.uint8)
+        self.arrays = (self.x, self.y, self.vx, self.vy, self.life, self.colour)
+        self.rng = np.random.default_rng(seed)
+        self.palette = []   # one size x size Surface per colour
+        self.colours = {}   # colour -> index into palette
+        self.rect = None    # area drawn by the last draw()
+        self.culled = 0     # particles dropped or culled to stay in budget
+
+    def _colour_index(self, colour):
+        key = tuple(pygame.Color(colour))
+        index = self.colours.get(key)
+        if index is None:
+            square = pygame.Surface((self.size, self.size))
+            square.fill(key)
+            index = self.colours[key] = len(self.palette)
+            self.palette.append(_display_format(square))
+        return index
+
+    def burst(self, rect, colour, n=None):
+        """Spawn n particles from inside rect, as many as the limit allows."""
+        n = self.per_burst if n is None else n
+        room = self.limit - self.count
+        if n > room:
+            self.culled += n - max(room, 0)
+            n = room
+        if n <= 0:
+            return
+        rng = self.rng
+        start, end = self.count, self.count + n
+        self.x[start:end] = rng.uniform(rect.left, rect.right - self.size, n)
+        self.y[start:end] = rng.uniform(rect.top, rect.bottom - self.size, n)
+        self.vx[start:end] = rng.uniform(-3.0, 3.0, n)
+        self.vy[start:end] = rng.uniform(-4.0, 1.0, n)
+        self.life[start:end] = rng.integers(self.lifetime // 2, self.lifetime, n)
+        self.colour[start:end] = self._colour_index(colour)
+        self.count = end
+
+    def on_event(self, event, data):
+        # the listener runs before the hit is applied, so this is the
+        # colour the brick was
+        if event == BLOCK_HIT and self.wall is not None:
+            row, col = data
+            wall = self.wall
+            self.burst(wall.block_rect(row, col), brick_colour(wall.strength[row * wall.cols + col]))
+
+    def update(self):
+        """Advance every particle one simulation step and drop the dead."""
+        n = self.count
+        if not n:
+            return
+        x, y, vy, life = self.x[:n], self.y[:n], self.vy[:n], self.life[:n]
+        vy += self.gravity
+        x += self.vx[:n]
+        y += vy
+        life -= 1
+        # gone once dead or off the game area (never over the touchpad)
+        self._keep((life > 0) & (y < game_height - self.size) & (x > -self.size) & (x < screen_width))
+
+    def _keep(self, keep):
+        kept = int(np.count_nonzero(keep))
+        if kept == self.count:
+            return
+        for array in self.arrays:
+            array[:kept] = array[:self.count][keep]
+        self.count = kept
+
+    def budget(self, frame_time):
+        """Adapt the limit to the last frame's work time in seconds."""
+        if frame_time > frame_budget:
+            self.limit = max(self.limit * 3 // 4, self.per_burst)
+            if self.count > self.limit:
+                # cull the particles closest to dying
+                n = self.count
+                keep = np.zeros(n, dtype=bool)
+                keep[np.argpartition(self.life[:n], n - self.limit)[n - self.limit:]] = True
+                self.culled += n - self.limit
+                self._keep(keep)
+        elif self.limit < self.capacity:
+            self.limit = min(self.limit + self.per_burst, self.capacity)
+
+    def draw(self, surface):
+        """Draw every particle with one blits call and return the area
+        drawn, or None. Repaint the previous area (self.rect) before."""
+        n = self.count
+        if not n:
+            self.rect = None
+            return None
+        xs = self.x[:n].astype(np.int32)
+        ys = self.y[:n].astype(np.int32)
+        palette = self.palette
+        surface.blits(zip(map(palette.__getitem__, self.colour[:n].tolist()), zip(xs.tolist(), ys.tolist())),
+                      doreturn=False)
+        left, top = int(xs.min()), int(ys.min())
+        rect = pygame.Rect(left, top, int(xs.max()) - left + self.size, int(ys.max()) - top + self.size)
+        self.rect = rect.clip(surface.get_rect())
+        return self.rect
@@ -0,0 +1,262 @@
+# Per-frame timing for the BreakOut3 main loop.
+#
+# FrameProfiler records how long each phase of a frame took (event pump,
+# input, physics, draw, display update) into a fixed-size ring buffer. While
+# it is disabled every call returns straight away. ProfileOverlay draws a
+# frame-time graph, the FPS and the slowest phase in the touchpad area, and
+# the samples can be exported as CSV or as a Chrome trace (chrome://tracing,
+# Perfetto). StartupLog timestamps the phases of launching the game, and
+# LatencyProbe measures how long a touch takes to show up on screen.
+import json
+import time
+from array import array
+
+import pygame
+
+PHASES = ('events', 'input', 'physics', 'draw', 'update')
+EVENTS, INPUT, PHYSICS, DRAW, UPDATE = range(len(PHASES))
+
+frame_budget = 1.0 / 60  # seconds per frame at 60 FPS
+
+
+class FrameProfiler:
+    """Ring buffer of per-phase frame timings.
+
+    Call begin_frame() at the top of the loop, mark(phase) as each phase
+    ends and end_frame() at the bottom. Each frame stores its start time and
+    one duration per phase, in seconds.
+    """
+
+    def __init__(self, capacity=600, enabled=False, clock=time.perf_counter):
+        self.capacity = capacity
+        self.enabled = enabled
+        self.clock = clock
+        self.stride = len(PHASES) + 1
+        self.samples = array('d', bytes(8 * capacity * self.stride))
+        self.count = 0  # frames recorded so far, the buffer keeps the last capacity
+        self._base = None
+        self._last = 0.0
+
+    def begin_frame(self):
+        if not self.enabled:
+            self._base = None
+            return
+        now = self.clock()
+        self._base = (self.count % self.capacity) * self.stride
+        self.samples[self._base] = now
+        self._last = now
+
+    def mark(self, phase):
+        if self._base is None:
+            return
+        now = self.clock()
+        self.samples[self._base + 1 + phase] = now - self._last
+        self._last = now
+
+    def end_frame(self):
+        if self._base is not None:
+            self.count += 1
+            self._base = None
+
+    def clear(self):
+        self.count = 0
+
+    def frames(self, last=None):
+        """(start, [phase durations]) of the recorded frames, oldest first."""
+        available = min(self.count, self.capacity)
+        if last is not None:
+            available = min(available, last)
+        samples = self.samples
+        for n in range(self.count - available, self.count):
+            base = (n % self.capacity) * self.stride
+            yield samples[base], samples[base + 1:base + self.stride]
+
+    def frame_times(self, last=None):
+        """Seconds from each frame's start to the next one's."""
+        starts = [start for start, _ in self.frames(last)]
+        return [b - a for a, b in zip(starts, starts[1:])]
+
+    def summary(self, last=60):
+        """FPS, mean frame time and mean time per phase over the last frames,
+        plus the slowest phase."""
+        frames = list(self.frames(last))
+        if len(frames) < 2:
+            return None
+        span = frames[-1][0] - frames[0][0]
+        totals = [0.0] * len(PHASES)
+        for _, durations in frames:
+            for i, duration in enumerate(durations):
+                totals[i] += duration
+        phases = {name: total / len(frames) for name, total in zip(PHASES, totals)}
+        return {
+            'fps': (len(frames) - 1) / span if span > 0 else 0.0,
+            'frame_time': span / (len(frames) - 1),
+            'phases': phases,
+            'slowest': max(phases, key=phases.get),
+        }
+
+    def export_csv(self, path):
+        with open(path, 'w') as f:
+            f.write('frame,start_ms,' + ','.join(f'{name}_ms' for name in PHASES) + '\n')
+            first = self.count - min(self.count, self.capacity)
+            for n, (start, durations) in enumerate(self.frames(), first):
+                f.write(f'{n},{start * 1e3:.3f},' + ','.join(f'{d * 1e3:.3f}' for d in durations) + '\n')
+
+    def export_trace(self, path):
+        """Write the frames as Chrome trace events, one slice per phase."""
+        events = []
+        for start, durations in self.frames():
+            ts = start
+            for name, duration in zip(PHASES, durations):
+                events.append({'name': name, 'ph': 'X', 'pid': 1, 'tid': 1,
+                               'ts': round(ts * 1e6, 1), 'dur': round(duration * 1e6, 1)})
+                ts += duration
+        with open(path, 'w') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+
+    def export(self, path):
+        # by extension: .csv, anything else is a Chrome trace
+        if path.lower().endswith('.csv'):
+            self.export_csv(path)
+        else:
+            self.export_trace(path)
+
+
+class StartupLog:
+    """Milliseconds from creation to each startup phase.
+
+    mark() may be called from any thread; report() lists the phases in the
+    order they finished.
+    """
+
+    def __init__(self, clock=time.perf_counter):
+        self.clock = clock
+        self.began = clock()
+        self.phases = []
+
+    def mark(self, name):
+        self.phases.append((name, self.clock() - self.began))
+
+    def report(self):
+        phases = sorted(self.phases, key=lambda phase: phase[1])
+        return 'Startup: ' + ', '.join(f'{name} {elapsed * 1e3:.0f} ms' for name, elapsed in phases)
+
+
+class LatencyProbe:
+    """Input-to-display latency of touch and mouse paddle commands.
+
+    Call command() when a new touch target is sampled and presented() after
+    every display.update() with the centre x of the paddle as drawn. For each
+    command it records the time until the drawn paddle first moves
+    (response) and until it is within settle_px of the target (settle); the
+    gap between them is Paddle.move's 0.2 smoothing. A command replaces one
+    that has not settled yet.
+    """
+
+    settle_px = 5  # Paddle.move can't get closer than this
+
+    def __init__(self, low, high, clock=time.perf_counter):
+        self.low = low    # range the paddle centre can reach
+        self.high = high
+        self.clock = clock
+        self.pending = None  # [sampled at, target, starting centre, response]
+        self.response = []
+        self.settle = []
+        self.distance = []
+
+    def command(self, target_x, paddle_x):
+        target_x = min(max(target_x, self.low), self.high)
+        if abs(target_x - paddle_x) < self.settle_px:
+            self.pending = None  # nothing for the paddle to do
+            return
+        self.pending = [self.clock(), target_x, paddle_x, None]
+
+    def presented(self, paddle_x):
+        pending = self.pending
+        if pending is None:
+            return
+        elapsed = self.clock() - pending[0]
+        if pending[3] is None and paddle_x != pending[2]:
+            pending[3] = elapsed
+        if abs(pending[1] - paddle_x) < self.settle_px:
+            self.response.append(pending[3] if pending[3] is not None else elapsed)
+            self.settle.append(elapsed)
+            self.distance.append(abs(pending[1] - pending[2]))
+            self.pending = None
+
+    def report(self, settle_steps=None, step_time=frame_budget):
+        """Percentiles of both latencies, in a line for the console.
+
+        settle_steps(distance), if given, models the smoothing alone so the
+        report can say how much of the settle time it accounts for.
+        """
+        if not self.settle:
+            return 'Input latency: no touch commands settled'
+        response = sorted(self.response)
+        settle = sorted(self.settle)
+        distance = sorted(self.distance)[len(self.distance) // 2]
+
+        def percentiles(samples):
+            return (f'p50 {samples[len(samples) // 2] * 1e3:.1f} ms, '
+                    f'p95 {samples[min(int(len(samples) * 0.95), len(samples) - 1)] * 1e3:.1f} ms')
+
+        line = (f'Input latency over {len(settle)} touches: first movement {percentiles(response)}; '
+                f'within {self.settle_px} px of the target {percentiles(settle)}')
+        if settle_steps is not None:
+            steps = settle_steps(distance, self.settle_px)
+            line += (f'; for the median {distance} px move the smoothing alone takes '
+                     f'{steps} steps ({steps * step_time * 1e3:.0f} ms)')
+        return line
+
+
+class ProfileOverlay:
+    """Frame-time graph and stats drawn over the bottom of the touchpad."""
+
+    graph_col = (0, 188, 255)
+    over_budget_col = (255, 27, 145)
+    budget_col = (139, 255, 74)
+    panel_col = (20, 20, 20)
+    text_col = (220, 220, 220)
+
+    def __init__(self, profiler, rect, font):
+        self.profiler = profiler
+        self.rect = pygame.Rect(rect)
+        self.font = font
+        self.visible = False
+        self.label = ''
+        # the label changes every refresh, so it is rendered here rather
+        # than pushing the game's text out of the shared text cache
+        self.label_surface = None
+        self._label_frame = -1
+
+    def draw(self, surface):
+        """Draw the overlay and return its rect for display.update()."""
+        rect = self.rect
+        surface.fill(self.panel_col, rect)
+        graph_height = rect.height - 20
+        scale = graph_height / (frame_budget * 2)  # the graph tops out at twice the budget
+        bars = rect.width // 2
+        times = self.profiler.frame_times(bars + 1)
+        x = rect.right - len(times) * 2
+        for frame_time in times:
+            height = min(int(frame_time * scale), graph_height)
+            colour = self.over_budget_col if frame_time > frame_budget else self.graph_col
+            surface.fill(colour, (x, rect.bottom - height, 2, height))
+            x += 2
+        budget_y = rect.bottom - int(frame_budget * scale)
+        surface.fill(self.budget_col, (rect.left, budget_y, rect.width, 1))
+
+        # refresh the numbers a few times a second so they stay readable
+        if self.profiler.count - self._label_frame >= 15:
+            self._label_frame = self.profiler.count
+            stats = self.profiler.summary()
+            if stats is not None:
+                slowest = stats['slowest']
+                label = (f"{stats['fps']:.0f} FPS   {stats['frame_time'] * 1e3:.1f} ms/frame   "
+                         f"slowest: {slowest} {stats['phases'][slowest] * 1e3:.2f} ms")
+                if label != self.label:
+                    self.label = label
+                    self.label_surface = self.font.render(label, True, self.text_col)
+        if self.label_surface is not None:
+            surface.blit(self.label_surface, (rect.left + 4, rect.top + 2))
+        return rect
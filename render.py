@@ -0,0 +1,347 @@
+# Drawing for BreakOut3.
+#
+# The Renderer draws a GameState onto a Surface and only repaints what
+# changed since the last frame: the old and new ball and paddle rects,
+# bricks that were hit and text that changed. It returns those rects so the
+# caller can pass them to pygame.display.update().
+from collections import OrderedDict
+
+import pygame
+
+from simulation import screen_width, game_height, touchpad_height, ROUND_START, BLOCK_HIT, WON, LOST
+
+# define colours
+bg = (0, 0, 0)
+block_red = (255, 27, 145)
+block_green = (139, 255, 74)
+block_blue = (0, 188, 255)
+paddle_col = (171, 71, 188)
+paddle_outline = (171, 71, 188)
+text_col = (0, 251, 115)
+touchpad_bg = (40, 40, 40)
+
+touchpad_rect = pygame.Rect(0, game_height, screen_width, touchpad_height)
+
+
+class TextCache:
+    """Bounded LRU cache of rendered text surfaces.
+
+    Keyed on (font, text, colour, antialias), so the same string is only
+    rasterized once while it stays among the maxsize most recently used.
+    hits and misses count lookups since the last clear().
+    """
+
+    def __init__(self, maxsize=64):
+        self.maxsize = maxsize
+        self.surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, text_font, text, colour, antialias=True):
+        key = (text_font, text, tuple(pygame.Color(colour)), antialias)
+        img = self.surfaces.get(key)
+        if img is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return img
+        self.misses += 1
+        img = text_font.render(text, antialias, colour)
+        self.surfaces[key] = img
+        if len(self.surfaces) > self.maxsize:
+            self.surfaces.popitem(last=False)
+        return img
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'size': len(self.surfaces), 'maxsize': self.maxsize}
+
+    def clear(self):
+        self.surfaces.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+# shared by the text helpers, the Renderer and any HUD text
+text_cache = TextCache()
+
+
+# function for outputting text onto the screen
+def draw_text(surface, text, text_font, text_column, x, y):
+    img = text_cache.render(text_font, text, text_column)
+    surface.blit(img, (x, y))
+    return img.get_rect(topleft=(x, y))
+
+
+# New function for drawing centered text
+def draw_text_centered(surface, text, text_font, text_column, y):
+    img = text_cache.render(text_font, text, text_column)
+    text_rect = img.get_rect(center=(screen_width // 2, y))
+    surface.blit(img, text_rect)
+    return text_rect
+
+
+def _display_format(surface):
+    # match the display's pixel format for fast blits; off-screen rendering
+    # without a video mode keeps the surface as it is
+    try:
+        return surface.convert()
+    except pygame.error:
+        return surface
+
+
+def brick_colour(strength):
+    if strength >= 3:
+        return block_blue  # levels can have stronger bricks, they look the same
+    elif strength == 2:
+        return block_green
+    elif strength == 1:
+        return block_red
+    return bg
+
+
+class Atlas:
+    """Every sprite the game draws, rasterized once into one surface.
+
+    Bricks (one per strength), the paddle and the ball sit side by side;
+    the areas are passed to Surface.blits. Pixels outside the ball circle
+    are the colour key so the ball can be blitted over bricks and paddle.
+    """
+
+    colour_key = (255, 0, 255)
+    ball_margin = 2  # draw.circle can spill a pixel past the ball rect
+
+    def __init__(self, wall, paddle, ball):
+        self.key = (wall.width, wall.height, paddle.rect.size, ball.ball_rad)
+        brick_w, brick_h = wall.width, wall.height
+        ball_size = ball.ball_rad * 2 + self.ball_margin * 2
+        paddle_w, paddle_h = paddle.rect.size
+        width = brick_w * 4 + paddle_w + ball_size
+        height = max(brick_h, paddle_h, ball_size)
+        atlas = pygame.Surface((width, height))
+        atlas.fill(self.colour_key)
+
+        # bricks for strength 0 (background) to 3, with their 2px bg border
+        self.bricks = []
+        for strength in range(4):
+            area = pygame.Rect(strength * brick_w, 0, brick_w, brick_h)
+            atlas.fill(bg, area)
+            atlas.fill(brick_colour(strength), area.inflate(-4, -4))
+            self.bricks.append(area)
+
+        self.paddle = pygame.Rect(brick_w * 4, 0, paddle_w, paddle_h)
+        pygame.draw.rect(atlas, paddle_col, self.paddle)
+        pygame.draw.rect(atlas, paddle_outline, self.paddle, 3)
+
+        self.ball = pygame.Rect(self.paddle.right, 0, ball_size, ball_size)
+        centre = (self.ball.x + self.ball_margin + ball.ball_rad, self.ball.y + self.ball_margin + ball.ball_rad)
+        pygame.draw.circle(atlas, paddle_col, centre, ball.ball_rad)
+        pygame.draw.circle(atlas, paddle_outline, centre, ball.ball_rad, 3)
+
+        self.surface = _display_format(atlas)
+        self.surface.set_colorkey(self.colour_key)
+
+    def brick(self, strength):
+        return self.bricks[min(strength, 3)]
+
+
+def _lerp(a, b, alpha):
+    return round(a + (b - a) * alpha)
+
+
+def _merge(rects):
+    # union overlapping rects so display.update gets a short list
+    merged = []
+    for rect in rects:
+        i = rect.collidelist(merged)
+        while i != -1:
+            rect = rect.union(merged.pop(i))
+            i = rect.collidelist(merged)
+        merged.append(rect)
+    return merged
+
+
+class Renderer:
+    """Draws a GameState, repainting only the regions that changed.
+
+    Sprites come from an Atlas and the bricks are composed into a cached
+    wall surface that is patched when a brick's strength changes, so a
+    repaint is one Surface.blits call. Subscribe on_event to the GameState
+    so hit bricks get patched, and call invalidate() whenever the whole
+    surface needs drawing again (first frame, window exposed).
+    """
+
+    max_ball_rects = 16  # more moving ball rects than this repaint the whole game area
+
+    def __init__(self, surface, font, title_font):
+        self.surface = surface
+        self.font = font
+        self.title_font = title_font
+        self.full_redraw = True
+        self.atlas = None
+        self.wall_surface = None
+        self.touchpad_surface = None
+        self.ball_rects = []
+        self.paddle_rect = None
+        self.hit_bricks = set()
+        self.damaged = []  # areas drawn over by someone else
+        self.text_keys = None
+        self.text_items = []  # (surface, rect) of the text on screen
+        self.prompt_visible = True  # blinked by the idle loop between rounds
+
+    def invalidate(self):
+        self.full_redraw = True
+
+    def damage(self, rect):
+        """Repaint rect on the next draw(), e.g. after an overlay is hidden."""
+        self.damaged.append(pygame.Rect(rect))
+
+    def blink(self):
+        """Toggle the start prompt, the attract animation between rounds."""
+        self.prompt_visible = not self.prompt_visible
+
+    def on_event(self, event, data):
+        if event == BLOCK_HIT:
+            self.hit_bricks.add(data)
+        elif event == ROUND_START:
+            # the wall was rebuilt
+            self.invalidate()
+        elif event in (WON, LOST):
+            self.prompt_visible = True
+
+    def texts(self, state):
+        """(text, font, centre) of every text that should be on screen."""
+        texts = []
+        if not state.live_ball:
+            # Show touchpad instructions ONLY when game is not running
+            if self.prompt_visible:
+                texts.append(("Touch here to start, move paddle", self.font,
+                              (screen_width // 2, game_height + touchpad_height // 2)))
+            # print player instructions
+            if state.game_over == 1:
+                texts.append(('YOU WON!', self.font, (screen_width // 2, game_height // 2 + 200)))
+            elif state.game_over == -1:
+                texts.append(('YOU LOST!', self.font, (screen_width // 2, game_height // 2 + 200)))
+            texts.append(('BreakOut 3', self.title_font, (screen_width // 2, game_height // 2 + 100)))
+        return texts
+
+    def build(self, state):
+        """(Re)build the atlas if the geometry changed, and the wall surface."""
+        wall = state.wall
+        key = (wall.width, wall.height, state.paddle.rect.size, state.ball.ball_rad)
+        if self.atlas is None or self.atlas.key != key:
+            self.atlas = Atlas(wall, state.paddle, state.ball)
+        if self.touchpad_surface is None:
+            panel = pygame.Surface(touchpad_rect.size)
+            panel.fill(touchpad_bg)
+            self.touchpad_surface = _display_format(panel)
+        if self.wall_surface is None:
+            self.wall_surface = _display_format(pygame.Surface((screen_width, game_height)))
+        self.wall_surface.fill(bg)
+        atlas = self.atlas
+        self.wall_surface.blits([(atlas.surface, (col * wall.width, row * wall.height), atlas.brick(strength))
+                                 for row, col, strength in wall.bricks()], doreturn=False)
+
+    def patch_brick(self, wall, row, col):
+        strength = wall.strength[row * wall.cols + col]
+        self.wall_surface.blit(self.atlas.surface, (col * wall.width, row * wall.height), self.atlas.brick(strength))
+
+    def draw(self, state, alpha=1.0, previous=None):
+        """Bring the surface up to date with state and return the dirty rects.
+
+        previous is state.positions() from before the last simulation step;
+        the balls and paddle are then drawn alpha of the way from there to
+        where they are now. Balls aren't interpolated in a frame where one
+        was lost, as the list no longer lines up.
+        """
+        dirty = []
+        if self.full_redraw:
+            self.build(state)
+            self.hit_bricks.clear()
+            previous = None  # a new round teleports the ball, don't slide it
+
+        margin = Atlas.ball_margin
+        paddle_rect = state.paddle.rect.copy()
+        interpolate = previous is not None and alpha < 1.0
+        lerp_balls = interpolate and len(previous[0]) == len(state.balls)
+        ball_rects = []
+        for n, ball in enumerate(state.balls):
+            ball_rect = ball.rect.copy()
+            if lerp_balls:
+                ball_x, ball_y = previous[0][n]
+                ball_rect.topleft = _lerp(ball_x, ball_rect.x, alpha), _lerp(ball_y, ball_rect.y, alpha)
+            ball_rect.inflate_ip(margin * 2, margin * 2)
+            ball_rects.append(ball_rect)
+        if interpolate:
+            paddle_x, paddle_y = previous[1]
+            paddle_rect.topleft = _lerp(paddle_x, paddle_rect.x, alpha), _lerp(paddle_y, paddle_rect.y, alpha)
+
+        # moving objects: repaint where they were and where they are now
+        if ball_rects != self.ball_rects:
+            moved = self.ball_rects + ball_rects
+            if len(moved) > self.max_ball_rects:
+                # past a few balls one repaint of the game area is cheaper,
+                # plus anything that has dropped into the touchpad
+                dirty.append(self.wall_surface.get_rect())
+                dirty.extend(rect for rect in moved if rect.bottom > game_height)
+            else:
+                dirty.extend(moved)
+            self.ball_rects = ball_rects
+        if paddle_rect != self.paddle_rect:
+            if self.paddle_rect is not None:
+                dirty.append(self.paddle_rect)
+            dirty.append(paddle_rect)
+            self.paddle_rect = paddle_rect
+
+        dirty.extend(self.damaged)
+        self.damaged.clear()
+
+        # bricks whose strength changed
+        for row, col in self.hit_bricks:
+            self.patch_brick(state.wall, row, col)
+            dirty.append(state.wall.block_rect(row, col))
+        self.hit_bricks.clear()
+
+        # text only gets looked up again when it changes
+        keys = self.texts(state)
+        if keys != self.text_keys:
+            dirty.extend(rect for _, rect in self.text_items)
+            self.text_items = []
+            for text, text_font, centre in keys:
+                img = text_cache.render(text_font, text, text_col)
+                self.text_items.append((img, img.get_rect(center=centre)))
+            dirty.extend(rect for _, rect in self.text_items)
+            self.text_keys = keys
+
+        if self.full_redraw:
+            self.full_redraw = False
+            dirty = [self.surface.get_rect()]
+        else:
+            dirty = _merge([rect.clip(self.surface.get_rect()) for rect in dirty])
+        for rect in dirty:
+            self.repaint(rect)
+        return dirty
+
+    def repaint(self, area):
+        """Redraw everything inside area with one batched blit."""
+        atlas = self.atlas.surface
+        blits = []
+        # draw game area objects
+        game_area = area.clip(self.wall_surface.get_rect())
+        if game_area:
+            blits.append((self.wall_surface, game_area.topleft, game_area))
+        if self.paddle_rect.colliderect(area):
+            blits.append((atlas, self.paddle_rect.topleft, self.atlas.paddle))
+        ball_area = self.atlas.ball
+        blits.extend((atlas, rect.topleft, ball_area) for rect in self.ball_rects if rect.colliderect(area))
+
+        # draw touchpad zone
+        touchpad_area = area.clip(touchpad_rect)
+        if touchpad_area:
+            blits.append((self.touchpad_surface, touchpad_area.topleft, touchpad_area.move(0, -game_height)))
+
+        for img, rect in self.text_items:
+            if rect.colliderect(area):
+                blits.append((img, rect))
+
+        self.surface.set_clip(area)
+        self.surface.blits(blits, doreturn=False)
+        self.surface.set_clip(None)
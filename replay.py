@@ -0,0 +1,281 @@
+# Input recording and replay for BreakOut3.
+#
+# GameState is deterministic, so a session is fully described by its starting
+# wall and the FrameInput of every simulation step. A log is:
+#
+#   header   magic b'BO3R', version, sim rate, seed, rows, cols, balls
+#            served per round (version 2), brick height (version 3), then
+#            the zlib-compressed starting brick strengths
+#   records  one byte per run of identical steps: bit 0 LEFT, bit 1 RIGHT,
+#            bit 2 start, bit 3 target_x follows as a zigzag varint of the
+#            change from the previous target_x; the high nibble is the run
+#            length - 1 (0-13), or 14 for a varint run length - 15 after the
+#            target. 0xFF ends the records.
+#   footer   step count and GameState.digest() of the final state (u32 each)
+#
+# The recorder flushes its file once a second of play, so a session that
+# crashes leaves a log without the END byte and footer, possibly cut off
+# part-way through a record; it replays up to the last complete record.
+#
+# Idle or key-held stretches collapse into a few bytes, and a step with a
+# touch target usually costs two, so hours of play fit in kilobytes.
+#
+# Run "python replay.py session.bo3r" to re-run a log headless as fast as the
+# CPU allows and check it ends in the recorded state.
+import argparse
+import struct
+import sys
+import time
+import zlib
+
+from simulation import GameState, FrameInput, Wall, brick_height
+from timestep import sim_rate
+
+MAGIC = b'BO3R'
+VERSION = 3
+HEADER_V1 = struct.Struct('<4sBHIHHI')
+HEADER_V2 = struct.Struct('<4sBHIHHHI')
+HEADER = struct.Struct('<4sBHIHHHHI')
+FOOTER = struct.Struct('<II')
+END = 0xFF
+
+LEFT = 0x01
+RIGHT = 0x02
+START = 0x04
+TARGET = 0x08
+RUN_VARINT = 14
+
+
+class ReplayError(Exception):
+    pass
+
+
+def _encode_varint(value):
+    out = bytearray()
+    while value >= 0x80:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+def _decode_varint(data, offset):
+    value = shift = 0
+    while True:
+        if offset >= len(data):
+            raise ReplayError('input log ends part-way through a number')
+        part = data[offset]
+        offset += 1
+        value |= (part & 0x7F) << shift
+        shift += 7
+        if not part & 0x80:
+            return value, offset
+
+
+def _zigzag(value):
+    return value * 2 if value >= 0 else -value * 2 - 1
+
+
+def _unzigzag(value):
+    return value >> 1 if not value & 1 else -(value >> 1) - 1
+
+
+class InputRecorder:
+    """Writes the FrameInput of every step to a binary log.
+
+    Start recording with a freshly created GameState, call record() once
+    per simulation step with the input passed to GameState.step(), and
+    close() at the end so the footer with the final state is written.
+    """
+
+    def __init__(self, path, state, rate=sim_rate, seed=0):
+        self.file = open(path, 'wb')
+        self.state = state
+        self.rate = rate  # steps between flushes of the file
+        self.steps = 0
+        self.pending = None  # (flags, target_x) of the run being counted
+        self.run = 0
+        self.last_target = 0
+        layout = zlib.compress(bytes(_start_layout(state)))
+        self.file.write(HEADER.pack(MAGIC, VERSION, rate, seed, state.wall.rows, state.wall.cols,
+                                    state.serve_count, state.wall.height, len(layout)))
+        self.file.write(layout)
+
+    def record(self, inp):
+        flags = (LEFT if inp.left else 0) | (RIGHT if inp.right else 0) | (START if inp.start else 0)
+        target_x = inp.target_x
+        if target_x is not None:
+            flags |= TARGET
+        self.steps += 1
+        if not self.steps % self.rate:
+            self.file.flush()
+        if (flags, target_x) == self.pending:
+            self.run += 1
+            return
+        self._flush()
+        self.pending = (flags, target_x)
+        self.run = 1
+
+    def _flush(self):
+        if self.pending is None:
+            return
+        flags, target_x = self.pending
+        if self.run <= RUN_VARINT:
+            record = bytes([(self.run - 1) << 4 | flags])
+        else:
+            record = bytes([RUN_VARINT << 4 | flags])
+        if flags & TARGET:
+            record += _encode_varint(_zigzag(target_x - self.last_target))
+            self.last_target = target_x
+        if self.run > RUN_VARINT:
+            record += _encode_varint(self.run - RUN_VARINT - 1)
+        self.file.write(record)
+
+    def close(self):
+        if self.file.closed:
+            return
+        self._flush()
+        self.file.write(bytes([END]))
+        self.file.write(FOOTER.pack(self.steps, self.state.digest()))
+        self.file.close()
+
+
+def _start_layout(state):
+    # strengths every round of the session starts from
+    wall = Wall(state.wall.rows, state.wall.cols)
+    wall.create_wall(state.layout)
+    return wall.strength
+
+
+class InputLog:
+    """A recorded session: the header fields, and inputs() to iterate the
+    FrameInput of every step."""
+
+    def __init__(self, data):
+        if len(data) < HEADER_V1.size or data[:4] != MAGIC:
+            raise ReplayError('not a BreakOut3 input log')
+        version = data[4]
+        if version == 1:
+            # single-ball logs from before multi-ball
+            _, _, self.rate, self.seed, self.rows, self.cols, layout_size = HEADER_V1.unpack_from(data)
+            self.balls = 1
+            self.brick_height = brick_height
+            offset = HEADER_V1.size
+        elif version == 2 and len(data) >= HEADER_V2.size:
+            # from before levels, every wall had the classic brick height
+            (_, _, self.rate, self.seed, self.rows, self.cols, self.balls,
+             layout_size) = HEADER_V2.unpack_from(data)
+            self.brick_height = brick_height
+            offset = HEADER_V2.size
+        elif version == VERSION and len(data) >= HEADER.size:
+            (_, _, self.rate, self.seed, self.rows, self.cols, self.balls, self.brick_height,
+             layout_size) = HEADER.unpack_from(data)
+            offset = HEADER.size
+        else:
+            raise ReplayError(f'unsupported input log version {version}')
+        try:
+            self.layout = zlib.decompress(data[offset:offset + layout_size])
+        except zlib.error:
+            raise ReplayError('input log is truncated in its header') from None
+        self.data = data
+        self.records = offset + layout_size
+        self.steps = None
+        self.digest = None
+        # the footer is only there if the recording was closed cleanly
+        end = self._end_of_records()
+        if end is not None and end + FOOTER.size <= len(data):
+            self.steps, self.digest = FOOTER.unpack_from(data, end)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            return cls(f.read())
+
+    def new_state(self):
+        return GameState(self.rows, self.cols, layout=bytes(self.layout), balls=self.balls,
+                         brick_height=self.brick_height)
+
+    def _end_of_records(self):
+        # offset just past the END byte, skipping over the records
+        data = self.data
+        offset = self.records
+        while offset < len(data):
+            byte = data[offset]
+            offset += 1
+            if byte == END:
+                return offset
+            # skip the target and run varints
+            for _ in range((byte & TARGET) // TARGET + (byte >> 4 == RUN_VARINT)):
+                while offset < len(data) and data[offset] & 0x80:
+                    offset += 1
+                offset += 1
+        return None
+
+    def inputs(self):
+        """Yield the FrameInput of every recorded step. A log cut off
+        part-way through a record ends at the last complete one."""
+        data = self.data
+        offset = self.records
+        last_target = 0
+        while offset < len(data):
+            byte = data[offset]
+            offset += 1
+            if byte == END:
+                return
+            flags = byte & 0x0F
+            target_x = None
+            run = (byte >> 4) + 1
+            try:
+                if flags & TARGET:
+                    delta, offset = _decode_varint(data, offset)
+                    target_x = last_target = last_target + _unzigzag(delta)
+                if run > RUN_VARINT:
+                    extra, offset = _decode_varint(data, offset)
+                    run = RUN_VARINT + 1 + extra
+            except ReplayError:
+                return
+            inp = FrameInput(target_x, bool(flags & LEFT), bool(flags & RIGHT), bool(flags & START))
+            for _ in range(run):
+                yield inp
+
+
+def replay_headless(log, state=None):
+    """Re-run every step of log as fast as possible.
+
+    Returns (state, steps); compare state.digest() with log.digest to check
+    the replay ended where the recording did.
+    """
+    if state is None:
+        state = log.new_state()
+    steps = 0
+    step = state.step
+    for inp in log.inputs():
+        step(inp)
+        steps += 1
+    return state, steps
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Replay a BreakOut3 input log headless.')
+    parser.add_argument('log', help='input log written by breakout3.py --record')
+    args = parser.parse_args(argv)
+
+    log = InputLog.load(args.log)
+    began = time.perf_counter()
+    state, steps = replay_headless(log)
+    elapsed = time.perf_counter() - began
+    print(f"{steps} steps in {elapsed:.3f}s ({steps / max(elapsed, 1e-9):.0f} steps/s, "
+          f"{steps / log.rate / max(elapsed, 1e-9):.0f}x real time)")
+    if log.digest is None:
+        print("⚠️  Log has no footer (recording was not closed), nothing to verify")
+        return 0
+    if steps == log.steps and state.digest() == log.digest:
+        print("✓ Replay matches the recorded session")
+        return 0
+    print(f"✗ Replay diverged: {steps} steps, digest {state.digest():08x}, "
+          f"recorded {log.steps} steps, digest {log.digest:08x}")
+    return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
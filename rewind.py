@@ -0,0 +1,193 @@
+# Rewind buffer for BreakOut3.
+#
+# RewindBuffer keeps a GameState.snapshot() of every simulation step for the
+# last few seconds. A whole snapshot is stored once per keyframe_interval
+# steps; the steps in between are stored as their XOR against that keyframe,
+# which is zero wherever nothing changed, encoded as runs:
+#
+#   delta    repeated: zero bytes to skip (varint), length of the changed
+#            run (varint), then the run's bytes
+#
+# A step of a single-ball round changes the ball, the paddle and a brick or
+# two, so a delta is around ten bytes and ten seconds at 60 steps/s fit in a
+# few kilobytes. Every delta is against its keyframe rather than the step
+# before, so any step decodes with one XOR and restoring it takes
+# microseconds. A step whose snapshot is a different length (balls were
+# lost) starts a new keyframe.
+#
+# Snapshots are plain bytes, so the same one can be restored into any number
+# of GameStates to branch what-if runs from one point:
+#
+#   snapshot = state.snapshot()
+#   for inputs in candidates:
+#       branch = GameState(rows, cols)
+#       branch.restore(snapshot)
+#       ...
+#
+# "python rewind.py" measures snapshot, delta and restore times and memory.
+import os
+
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+import argparse
+import re
+import sys
+import time
+from collections import deque
+
+from simulation import GameState, FrameInput
+from timestep import sim_rate
+from replay import _encode_varint, _decode_varint
+
+_changed = re.compile(rb'[^\x00]+')
+
+
+def encode_delta(snapshot, keyframe):
+    """snapshot as changed runs of its XOR with keyframe (same length)."""
+    size = len(snapshot)
+    xor = (int.from_bytes(snapshot, 'little') ^ int.from_bytes(keyframe, 'little')).to_bytes(size, 'little')
+    out = bytearray()
+    position = 0
+    for match in _changed.finditer(xor):
+        start, end = match.span()
+        out += _encode_varint(start - position)
+        out += _encode_varint(end - start)
+        out += xor[start:end]
+        position = end
+    return bytes(out)
+
+
+def decode_delta(delta, keyframe):
+    """The snapshot encode_delta(snapshot, keyframe) was made from."""
+    size = len(keyframe)
+    xor = bytearray(size)
+    offset = position = 0
+    while offset < len(delta):
+        skip, offset = _decode_varint(delta, offset)
+        length, offset = _decode_varint(delta, offset)
+        position += skip
+        xor[position:position + length] = delta[offset:offset + length]
+        offset += length
+        position += length
+    return (int.from_bytes(xor, 'little') ^ int.from_bytes(keyframe, 'little')).to_bytes(size, 'little')
+
+
+class RewindBuffer:
+    """The snapshots of the last seconds of steps, oldest dropped first.
+
+    Call push(state) after every GameState.step(); rewind(state) steps it
+    back. Memory is kept in segments of one keyframe and its deltas, and a
+    whole segment is dropped once the rest still cover seconds.
+    """
+
+    def __init__(self, seconds=10, rate=sim_rate, keyframe_interval=None):
+        self.capacity = max(int(seconds * rate), 1)  # steps kept at least
+        self.keyframe_interval = keyframe_interval or rate
+        self.segments = deque()  # [keyframe, [delta, ...]]
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def clear(self):
+        self.segments.clear()
+        self.count = 0
+
+    def push(self, state):
+        self.append(state.snapshot())
+
+    def append(self, snapshot):
+        segments = self.segments
+        if segments:
+            keyframe, deltas = segments[-1]
+            if len(deltas) + 1 < self.keyframe_interval and len(keyframe) == len(snapshot):
+                deltas.append(encode_delta(snapshot, keyframe))
+                self.count += 1
+                return
+        segments.append([snapshot, []])
+        self.count += 1
+        while self.count - (1 + len(segments[0][1])) >= self.capacity:
+            self.count -= 1 + len(segments.popleft()[1])
+
+    def get(self, back=0):
+        """The snapshot back steps before the newest (0 is the newest)."""
+        if not 0 <= back < self.count:
+            raise IndexError('rewind buffer index out of range')
+        for keyframe, deltas in reversed(self.segments):
+            if back <= len(deltas):
+                n = len(deltas) - back  # 0 is the keyframe itself
+                return keyframe if n == 0 else decode_delta(deltas[n - 1], keyframe)
+            back -= 1 + len(deltas)
+
+    def drop(self, steps=1):
+        """Forget the newest steps."""
+        segments = self.segments
+        steps = min(steps, self.count)
+        self.count -= steps
+        while steps:
+            deltas = segments[-1][1]
+            if steps > len(deltas):
+                steps -= 1 + len(deltas)
+                segments.pop()
+            else:
+                del deltas[len(deltas) - steps:]
+                steps = 0
+
+    def rewind(self, state, steps=1):
+        """Put state back steps steps before the newest snapshot and forget
+        the ones after it, so pushing carries on from there. Returns the
+        steps actually rewound, fewer when the buffer runs out; the oldest
+        snapshot is kept."""
+        steps = min(steps, self.count - 1)
+        if steps < 0:
+            return 0
+        state.restore(self.get(steps))
+        self.drop(steps)
+        return steps
+
+    def nbytes(self):
+        """Bytes of snapshot data held."""
+        return sum(len(keyframe) + sum(map(len, deltas)) for keyframe, deltas in self.segments)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Measure BreakOut3 snapshots and the rewind buffer.')
+    parser.add_argument('--seconds', type=float, default=10, help='rewind length (default: %(default)s)')
+    parser.add_argument('--balls', type=int, default=1, help='balls in play (default: %(default)s)')
+    args = parser.parse_args(argv)
+
+    # a scripted paddle that follows the first ball, so the round goes on
+    state = GameState(balls=args.balls)
+    state.start()
+    rewind = RewindBuffer(args.seconds)
+    steps = int(args.seconds * sim_rate)
+    began = time.perf_counter()
+    for _ in range(steps):
+        if not state.live_ball:
+            state.start()
+        state.step(FrameInput(target_x=state.ball.rect.centerx))
+        rewind.push(state)
+    elapsed = time.perf_counter() - began
+    snapshot = state.snapshot()
+    print(f"{steps} steps pushed, {elapsed / steps * 1e6:.1f} us per step including the push")
+    print(f"snapshot {len(snapshot)} bytes, buffer {rewind.nbytes():,} bytes for {len(rewind)} steps "
+          f"({len(snapshot) * len(rewind):,} as whole snapshots)")
+
+    samples = 10000
+    branch = GameState(balls=args.balls)
+    timings = [('snapshot', state.snapshot), ('restore', lambda: branch.restore(snapshot)),
+               ('decode a step', lambda: rewind.get(len(rewind) // 2))]
+    for name, op in timings:
+        began = time.perf_counter()
+        for _ in range(samples):
+            op()
+        print(f"{name + ':':<16}{(time.perf_counter() - began) / samples * 1e6:>8.2f} us")
+    if branch.digest() != state.digest():
+        print("✗ Restored state differs from the snapshot")
+        return 1
+    print("✓ Restored state matches")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,681 @@
+# Headless BreakOut3 simulation.
+#
+# Everything the game needs to play a round lives here: the wall, the paddle,
+# the ball and a GameState that steps them. Nothing in this module creates a
+# window, a Surface, a font or a Sound, so it can be stepped as fast as the CPU
+# allows on machines with no display or audio device. Rendering and audio hook
+# in by subscribing to GameState events.
+import struct
+import zlib
+from collections import namedtuple
+
+from pygame import Rect
+
+# game area size
+screen_width = 650
+game_height = 650          # Original game area height
+touchpad_height = 200      # Dedicated touchpad area
+screen_height = game_height + touchpad_height
+
+# wall layout
+cols = 6
+rows = 6
+brick_height = 50
+paddle_width = int(screen_width / cols)  # sized for the classic wall, whatever the level
+
+# events emitted by GameState, passed to listeners as (event, data)
+ROUND_START = 'round_start'
+PADDLE_HIT = 'paddle_hit'
+BLOCK_HIT = 'block_hit'    # data is (row, col) of the brick that was hit
+WON = 'won'
+LOST = 'lost'
+
+# one frame of player input: paddle target from touch/mouse (or None),
+# LEFT/RIGHT key state and whether a new round was requested
+FrameInput = namedtuple('FrameInput', ['target_x', 'left', 'right', 'start'],
+                        defaults=(None, False, False, False))
+NO_INPUT = FrameInput()
+
+# GameState.snapshot() layout: a header, the paddle, the wall's strength and
+# alive bytes, then one record per ball in play. Everything has a fixed
+# offset except the ball records at the end, so two snapshots of a round
+# with as many balls line up byte for byte.
+SNAPSHOT_VERSION = 1
+SNAPSHOT_HEADER = struct.Struct('<BBbHHH')   # version, live_ball, game_over, rows, cols, balls
+SNAPSHOT_PADDLE = struct.Struct('<4iib')     # rect, target_x, direction
+SNAPSHOT_BALL = struct.Struct('<4h3hb')      # rect, speed_x, speed_y, speed_max, game_over
+
+
+def _ignore(event, data=None):
+    pass
+
+
+def _sweep(x, y, size, dx, dy, rect):
+    """When a size x size box at (x, y) moving by (dx, dy) first touches rect.
+
+    Returns (t, axis) with t in [0, 1] as a fraction of the move and axis
+    'x', 'y' or 'xy' (corner) for the face it comes in through, or None if
+    it never touches rect, or already overlaps it at the start.
+    """
+    if dx > 0:
+        x_entry = (rect.left - (x + size)) / dx
+        x_exit = (rect.right - x) / dx
+    elif dx < 0:
+        x_entry = (rect.right - x) / dx
+        x_exit = (rect.left - (x + size)) / dx
+    elif x + size <= rect.left or x >= rect.right:
+        return None
+    else:
+        x_entry, x_exit = float('-inf'), float('inf')
+    if dy > 0:
+        y_entry = (rect.top - (y + size)) / dy
+        y_exit = (rect.bottom - y) / dy
+    elif dy < 0:
+        y_entry = (rect.bottom - y) / dy
+        y_exit = (rect.top - (y + size)) / dy
+    elif y + size <= rect.top or y >= rect.bottom:
+        return None
+    else:
+        y_entry, y_exit = float('-inf'), float('inf')
+
+    entry = max(x_entry, y_entry)
+    if entry < 0 or entry > 1 or entry >= min(x_exit, y_exit):
+        return None
+    if x_entry == y_entry:
+        return entry, 'xy'
+    return entry, 'x' if x_entry > y_entry else 'y'
+
+
+_alive_digits = bytes([ord('0')] + [ord('1')] * 255)  # strength -> '1' if it's a brick
+
+
+# brick wall class
+#
+# Bricks live in flat row-major storage: one strength byte per brick and an
+# alive bitmask, plus the live count. Geometry is computed from the grid, so
+# Rects are only made on demand for drawing. Copying, comparing or restoring
+# a wall is a bytes copy.
+class Wall:
+    def __init__(self, rows=rows, cols=cols, height=brick_height):
+        self.resize(rows, cols, height)
+
+    def resize(self, rows, cols, height=brick_height):
+        """Change the grid, e.g. for another level; it is empty until
+        create_wall()."""
+        self.rows = rows
+        self.cols = cols
+        self.width = screen_width // cols
+        self.height = height
+        self.strength = bytearray(rows * cols)
+        self.alive = bytearray((rows * cols + 7) // 8)
+        self.live = 0  # bricks with strength left, the round is won at 0
+
+    def create_wall(self, layout=None):
+        """Build the bricks. layout is an optional rows x cols grid of
+        strengths or the same as flat row-major bytes; by default strength
+        comes from the row index."""
+        strength = self.strength
+        if isinstance(layout, (bytes, bytearray, memoryview)):
+            strength[:] = layout
+            self._sync()
+            return
+        for row in range(self.rows):
+            for col in range(self.cols):
+                if layout is not None:
+                    value = layout[row][col]
+                else:
+                    value = 0
+                    if row < 2:
+                        value += 3
+                    elif row < 4:
+                        value += 2
+                    elif row < 6:
+                        value += 1
+                strength[row * self.cols + col] = value
+        self._sync()
+
+    def _sync(self):
+        # rebuild the alive bitmask and live count from the strengths: one
+        # '0'/'1' per brick, last brick first, is the bitmask as a binary
+        # number, so a level of any size is a few C-speed passes
+        bits = self.strength.translate(_alive_digits)[::-1]
+        self.alive = bytearray(int(bits or b'0', 2).to_bytes(len(self.alive), 'little'))
+        self.live = len(self.strength) - self.strength.count(0)
+
+    def is_alive(self, row, col):
+        i = row * self.cols + col
+        return self.alive[i >> 3] >> (i & 7) & 1 == 1
+
+    def block_rect(self, row, col):
+        return Rect(col * self.width, row * self.height, self.width, self.height)
+
+    def bricks(self):
+        """Yield (row, col, strength) for every brick still standing."""
+        strength = self.strength
+        for byte_index, bits in enumerate(self.alive):
+            if not bits:
+                continue  # eight destroyed bricks in a row
+            i = byte_index << 3
+            while bits:
+                if bits & 1:
+                    yield i // self.cols, i % self.cols, strength[i]
+                bits >>= 1
+                i += 1
+
+    def cell_range(self, rect):
+        """Rows and columns of the grid cells rect overlaps, as
+        (first_row, last_row, first_col, last_col), inclusive.
+
+        Bricks sit on a uniform width x height grid, so these are the only
+        bricks rect can collide with. The range is empty when rect is outside
+        the wall.
+        """
+        first_row = max(rect.top // self.height, 0)
+        last_row = min((rect.bottom - 1) // self.height, self.rows - 1)
+        first_col = max(rect.left // self.width, 0)
+        last_col = min((rect.right - 1) // self.width, self.cols - 1)
+        return first_row, last_row, first_col, last_col
+
+    def hit(self, row, col):
+        # reduce the block's strength by doing damage to it
+        i = row * self.cols + col
+        if self.strength[i] > 1:
+            self.strength[i] -= 1
+        else:
+            # Make block disappear
+            self.strength[i] = 0
+            self.alive[i >> 3] &= ~(1 << (i & 7))
+            self.live -= 1
+
+    def snapshot(self):
+        """The brick strengths as bytes, for copying, hashing or diffing."""
+        return bytes(self.strength)
+
+    def restore(self, snapshot):
+        self.strength[:] = snapshot
+        self._sync()
+
+    def copy(self):
+        other = Wall.__new__(Wall)
+        other.__dict__.update(self.__dict__)
+        other.strength = bytearray(self.strength)
+        other.alive = bytearray(self.alive)
+        return other
+
+    def diff(self, snapshot):
+        """Yield (row, col) of every brick whose strength differs from snapshot."""
+        for i, (a, b) in enumerate(zip(self.strength, snapshot)):
+            if a != b:
+                yield i // self.cols, i % self.cols
+
+
+# paddle class
+class Paddle():
+    def __init__(self):
+        self.direction = 1
+        self.reset()
+        self.target_x = self.rect.centerx  # target position from touch input
+
+    def move(self):
+        # Smoothly interpolate toward target_x
+        dx = self.target_x - self.rect.centerx
+        self.rect.x += int(dx * 0.2)  # adjust smoothing factor (0.2 = 20%)
+        self.clamp()
+        # Update direction for ball spin effect
+        self.direction = 1 if dx > 0 else (-1 if dx < 0 else 0)
+
+    def set_target(self, x):
+        self.target_x = x
+
+    def clamp(self):
+        # Clamp inside screen
+        self.rect.x = min(max(self.rect.x, 0), screen_width - self.rect.width)
+
+    @staticmethod
+    def settle_steps(distance, within=5):
+        # steps move() takes to get within px of a target distance away;
+        # under 5 px int(dx * 0.2) is 0, so it never gets closer than that
+        distance = abs(distance)
+        steps = 0
+        while distance >= max(within, 5):
+            distance -= int(distance * 0.2)
+            steps += 1
+        return steps
+
+    def reset(self):
+        self.height = 20
+        self.width = paddle_width
+        self.x = int((screen_width / 2) - (self.width / 2))
+        # Keep paddle above the game area (not inside touchpad)
+        self.y = game_height - (self.height * 2)
+        self.speed = 10
+        self.rect = Rect(self.x, self.y, self.width, self.height)
+        self.direction = 0
+        self.target_x = self.rect.centerx
+
+
+# ball class
+class GameBall:
+    # the overlap tests in move() only see the right face while the ball
+    # moves less than this per step; faster balls use move_swept()
+    collision_thresh = 5
+    max_bounces = 16  # contacts resolved per step before the ball just stops
+
+    # multi-ball rounds keep hundreds of these alive, so no per-instance dict
+    __slots__ = ('ball_rad', 'x', 'y', 'rect', 'speed_x', 'speed_y', 'speed_max', 'game_over')
+
+    def __init__(self, x, y):
+        self.rect = Rect(0, 0, 0, 0)
+        self.reset(x, y)
+
+    def move(self, wall, paddle, emit=_ignore):
+        # collision threshold
+        collision_thresh = self.collision_thresh
+        if max(self.speed_max, abs(self.speed_x), abs(self.speed_y)) > collision_thresh:
+            return self.move_swept(wall, paddle, emit)
+
+        # only the bricks in the grid cells the ball overlaps can be hit, and
+        # the ball overlaps every brick in those cells
+        first_row, last_row, first_col, last_col = wall.cell_range(self.rect)
+        strength = wall.strength
+        for row_count in range(first_row, last_row + 1):
+            for item_count in range(first_col, last_col + 1):
+                # check collision
+                if strength[row_count * wall.cols + item_count]:
+                    emit(BLOCK_HIT, (row_count, item_count))
+                    block_top = row_count * wall.height
+                    block_left = item_count * wall.width
+
+                    # check if collision was from above
+                    if abs(self.rect.bottom - block_top) < collision_thresh and self.speed_y > 0:
+                        self.speed_y *= -1
+                    # check if collision was from below
+                    if abs(self.rect.top - (block_top + wall.height)) < collision_thresh and self.speed_y < 0:
+                        self.speed_y *= -1
+                    # check if collision was from left
+                    if abs(self.rect.right - block_left) < collision_thresh and self.speed_x > 0:
+                        self.speed_x *= -1
+                    # check if collision was from right
+                    if abs(self.rect.left - (block_left + wall.width)) < collision_thresh and self.speed_x < 0:
+                        self.speed_x *= -1
+                    wall.hit(row_count, item_count)
+
+        # Check if the wall is destroyed (game won)
+        if wall.live == 0:
+            self.game_over = 1
+
+        # check for collision with walls
+        if self.rect.left < 0 or self.rect.right > screen_width:
+            self.speed_x *= -1
+
+        # check for collision with top of the game area
+        if self.rect.top < 0:
+            self.speed_y *= -1
+
+        # look for collision with paddle
+        if self.rect.colliderect(paddle.rect):
+            # paddle hit sound only when ball is coming down
+            if self.speed_y > 0:
+                emit(PADDLE_HIT, None)
+
+            # check if colliding from the top
+            if abs(self.rect.bottom - paddle.rect.top) < collision_thresh and self.speed_y > 0:
+                self.speed_y *= -1
+                self.speed_x += paddle.direction
+                if self.speed_x > self.speed_max:
+                    self.speed_x = self.speed_max
+                elif self.speed_x < 0 and self.speed_x < -self.speed_max:
+                    self.speed_x = -self.speed_max
+            else:
+                self.speed_x *= -1
+
+        self.rect.x += self.speed_x
+        self.rect.y += self.speed_y
+
+        # Check for ball missing the paddle (game lost condition) against game area height
+        if self.rect.bottom > game_height:
+            self.game_over = -1
+
+        return self.game_over
+
+    def move_swept(self, wall, paddle, emit=_ignore):
+        """Move like move(), but with continuous collision detection.
+
+        The ball travels along its motion vector to the first brick, paddle,
+        side or top it touches, bounces there and carries on with the rest of
+        the step, so it can't skip through anything at any speed.
+        """
+        # the paddle moves first and may have run into the ball
+        if self.rect.colliderect(paddle.rect):
+            self._push_out(paddle, emit)
+
+        x = float(self.rect.x)
+        y = float(self.rect.y)
+        size = self.rect.width
+        time_left = 1.0
+        for _ in range(self.max_bounces):
+            dx = self.speed_x * time_left
+            dy = self.speed_y * time_left
+            t, contacts = self._first_contacts(x, y, size, dx, dy, wall, paddle)
+            x += dx * t
+            y += dy * t
+            if not contacts:
+                break
+            time_left *= 1.0 - t
+
+            flip_x = flip_y = spin = False
+            for kind, axis, data in contacts:
+                if kind == BLOCK_HIT:
+                    emit(BLOCK_HIT, data)
+                    wall.hit(*data)
+                elif kind == PADDLE_HIT:
+                    if self.speed_y > 0:
+                        emit(PADDLE_HIT, None)
+                    # landing on top of the paddle adds its spin
+                    spin = 'y' in axis and self.speed_y > 0
+                flip_x = flip_x or 'x' in axis
+                flip_y = flip_y or 'y' in axis
+            if flip_x:
+                self.speed_x *= -1
+            if flip_y:
+                self.speed_y *= -1
+            if spin:
+                self._spin(paddle)
+        self.rect.x = round(x)
+        self.rect.y = round(y)
+
+        # Check if the wall is destroyed (game won)
+        if wall.live == 0:
+            self.game_over = 1
+
+        # Check for ball missing the paddle (game lost condition) against game area height
+        if self.rect.bottom > game_height:
+            self.game_over = -1
+
+        return self.game_over
+
+    def _spin(self, paddle):
+        self.speed_x += paddle.direction
+        if self.speed_x > self.speed_max:
+            self.speed_x = self.speed_max
+        elif self.speed_x < 0 and self.speed_x < -self.speed_max:
+            self.speed_x = -self.speed_max
+
+    def _push_out(self, paddle, emit):
+        # move the ball out of the paddle the short way: onto its top if the
+        # ball is coming down, else off the side it is nearest, unless the
+        # paddle has it pinned against the side of the game area
+        ball = self.rect
+        if self.speed_y > 0:
+            emit(PADDLE_HIT, None)
+        depth_top = ball.bottom - paddle.rect.top
+        depth_side = min(ball.right - paddle.rect.left, paddle.rect.right - ball.left)
+        if not (self.speed_y > 0 and depth_top <= depth_side):
+            if ball.centerx < paddle.rect.centerx and paddle.rect.left - ball.width >= 0:
+                ball.right = paddle.rect.left
+                self.speed_x = -abs(self.speed_x)
+                return
+            if ball.centerx >= paddle.rect.centerx and paddle.rect.right + ball.width <= screen_width:
+                ball.left = paddle.rect.right
+                self.speed_x = abs(self.speed_x)
+                return
+        ball.bottom = paddle.rect.top
+        if self.speed_y > 0:
+            self.speed_y *= -1
+            self._spin(paddle)
+        else:
+            self.speed_y = -abs(self.speed_y)
+
+    def _first_contacts(self, x, y, size, dx, dy, wall, paddle):
+        # earliest time of impact along (dx, dy) and everything touched then,
+        # as (kind, axis, data) with kind BLOCK_HIT, PADDLE_HIT or None for
+        # the sides and top of the game area
+        first = 1.0
+        contacts = []
+
+        def touch(t, kind, axis, data=None):
+            nonlocal first, contacts
+            if t < first - 1e-9:
+                first = t
+                contacts = [(kind, axis, data)]
+            elif t <= first + 1e-9:
+                contacts.append((kind, axis, data))
+
+        # sides and top of the game area
+        if dx < 0 and x + dx < 0:
+            touch(max(x / -dx, 0.0), None, 'x')
+        if dx > 0 and x + size + dx > screen_width:
+            touch(max((screen_width - x - size) / dx, 0.0), None, 'x')
+        if dy < 0 and y + dy < 0:
+            touch(max(y / -dy, 0.0), None, 'y')
+
+        # bricks in the cells the whole move passes over
+        swept = Rect(int(min(x, x + dx)) - 1, int(min(y, y + dy)) - 1,
+                     size + int(abs(dx)) + 3, size + int(abs(dy)) + 3)
+        first_row, last_row, first_col, last_col = wall.cell_range(swept)
+        brick = Rect(0, 0, wall.width, wall.height)
+        for row in range(first_row, last_row + 1):
+            for col in range(first_col, last_col + 1):
+                if wall.strength[row * wall.cols + col]:
+                    brick.topleft = col * wall.width, row * wall.height
+                    hit = _sweep(x, y, size, dx, dy, brick)
+                    if hit is not None:
+                        touch(hit[0], BLOCK_HIT, hit[1], (row, col))
+
+        hit = _sweep(x, y, size, dx, dy, paddle.rect)
+        if hit is not None:
+            touch(hit[0], PADDLE_HIT, hit[1])
+
+        return first, contacts
+
+    def reset(self, x, y):
+        self.ball_rad = 10
+        self.x = x - self.ball_rad
+        self.y = y
+        self.rect.update(self.x, self.y, self.ball_rad * 2, self.ball_rad * 2)
+        self.speed_x = 4
+        self.speed_y = -4
+        self.speed_max = 5
+        self.game_over = 0
+
+
+class BallPool:
+    """Recycles GameBalls, so serving and losing balls doesn't allocate.
+
+    active is the list of balls in play, in the order they were served.
+    """
+
+    def __init__(self):
+        self.active = []
+        self.free = []
+
+    def acquire(self, x, y):
+        if self.free:
+            ball = self.free.pop()
+            ball.reset(x, y)
+        else:
+            ball = GameBall(x, y)
+        self.active.append(ball)
+        return ball
+
+    def release(self, ball):
+        self.active.remove(ball)
+        self.free.append(ball)
+
+    def release_all(self):
+        self.free.extend(self.active)
+        self.active.clear()
+
+    def resize(self, n):
+        """Keep n balls active, releasing from the end or acquiring more;
+        the caller sets up the new balls."""
+        active = self.active
+        if len(active) > n:
+            self.free.extend(active[n:])
+            del active[n:]
+        while len(active) < n:
+            self.acquire(0, 0)
+
+
+class GameState:
+    """Owns the wall, paddle and balls and advances them one frame per step().
+
+    Each round serves balls balls; ball is the first one still in play and
+    balls lists all of them. A ball that falls out is recycled, and the
+    round is lost when the last one does.
+
+    Listeners registered with subscribe() are called as listener(event, data)
+    for ROUND_START, PADDLE_HIT, BLOCK_HIT, WON and LOST.
+    """
+
+    # horizontal speeds of the balls served, in turn
+    serve_speeds = (4, -4, 3, -3, 2, -2, 1, -1)
+
+    def __init__(self, rows=rows, cols=cols, layout=None, balls=1, brick_height=brick_height):
+        self.listeners = []
+        self.layout = layout  # brick strengths every round starts from
+        self.serve_count = balls
+        self.wall = Wall(rows, cols, brick_height)
+        self.wall.create_wall(layout)
+        self.paddle = Paddle()
+        self.pool = BallPool()
+        self.balls = self.pool.active
+        self.ball = self.pool.acquire(self.paddle.x + (self.paddle.width // 2), self.paddle.y - self.paddle.height)
+        self.live_ball = False
+        self.game_over = 0  # 0 is playing, 1 is won, -1 is lost
+
+    def set_layout(self, rows, cols, layout, brick_height=brick_height):
+        """Switch to another wall, e.g. the next level, and build it. The
+        Wall object stays the same, so whoever holds it keeps working; the
+        next start() serves on the new wall."""
+        self.layout = layout
+        self.wall.resize(rows, cols, brick_height)
+        self.wall.create_wall(layout)
+
+    def subscribe(self, listener):
+        self.listeners.append(listener)
+
+    def unsubscribe(self, listener):
+        self.listeners.remove(listener)
+
+    def emit(self, event, data=None):
+        for listener in self.listeners:
+            listener(event, data)
+
+    def digest(self):
+        """CRC32 of everything that affects the next step, for checking
+        that two runs are in the same state."""
+        ball = self.ball
+        paddle = self.paddle
+        fields = struct.pack('<4i3i4i2i2b', *ball.rect, ball.speed_x, ball.speed_y, ball.speed_max,
+                             *paddle.rect, paddle.target_x, paddle.direction,
+                             self.live_ball, self.game_over)
+        crc = zlib.crc32(self.wall.strength, zlib.crc32(fields))
+        for ball in self.balls[1:]:
+            crc = zlib.crc32(struct.pack('<4i3i', *ball.rect, ball.speed_x, ball.speed_y, ball.speed_max), crc)
+        return crc
+
+    def snapshot(self):
+        """Everything digest() covers as compact bytes; restore() puts a
+        GameState with the same wall size back in that state."""
+        paddle = self.paddle
+        wall = self.wall
+        parts = [SNAPSHOT_HEADER.pack(SNAPSHOT_VERSION, self.live_ball, self.game_over,
+                                      wall.rows, wall.cols, len(self.balls)),
+                 SNAPSHOT_PADDLE.pack(*paddle.rect, paddle.target_x, paddle.direction),
+                 wall.strength, wall.alive]
+        pack = SNAPSHOT_BALL.pack
+        parts.extend(pack(*ball.rect, ball.speed_x, ball.speed_y, ball.speed_max, ball.game_over)
+                     for ball in self.balls)
+        return b''.join(parts)
+
+    def restore(self, snapshot):
+        """Return to a snapshot() of this or another GameState. Listeners
+        are not told; bricks that changed can be found with wall.diff()."""
+        version, live_ball, game_over, rows, cols, count = SNAPSHOT_HEADER.unpack_from(snapshot)
+        wall = self.wall
+        if version != SNAPSHOT_VERSION:
+            raise ValueError(f'unsupported snapshot version {version}')
+        if (rows, cols) != (wall.rows, wall.cols):
+            raise ValueError(f'snapshot of a {rows}x{cols} wall, this one is {wall.rows}x{wall.cols}')
+        self.live_ball = bool(live_ball)
+        self.game_over = game_over
+        offset = SNAPSHOT_HEADER.size
+        paddle = self.paddle
+        x, y, width, height, paddle.target_x, paddle.direction = SNAPSHOT_PADDLE.unpack_from(snapshot, offset)
+        paddle.rect.update(x, y, width, height)
+        offset += SNAPSHOT_PADDLE.size
+        end = offset + len(wall.strength)
+        wall.strength[:] = snapshot[offset:end]
+        offset, end = end, end + len(wall.alive)
+        wall.alive[:] = snapshot[offset:end]
+        wall.live = len(wall.strength) - wall.strength.count(0)
+        self.pool.resize(count)
+        for ball, (x, y, width, height, ball.speed_x, ball.speed_y, ball.speed_max,
+                   ball.game_over) in zip(self.balls, SNAPSHOT_BALL.iter_unpack(snapshot[end:])):
+            ball.rect.update(x, y, width, height)
+        self.ball = self.balls[0]
+
+    def positions(self):
+        """Top-left corners of the balls and the paddle, for render
+        interpolation."""
+        return [ball.rect.topleft for ball in self.balls], self.paddle.rect.topleft
+
+    def start(self):
+        self.live_ball = True
+        self.game_over = 0
+        x = self.paddle.x + (self.paddle.width // 2)
+        y = self.paddle.y - self.paddle.height
+        self.pool.release_all()
+        self.ball = self.pool.acquire(x, y)
+        # extra balls go up from across the screen, each at its own angle
+        span = screen_width - self.ball.rect.width
+        for n in range(1, self.serve_count):
+            ball = self.pool.acquire((x + n * 97) % span + self.ball.ball_rad, y)
+            ball.speed_x = self.serve_speeds[n % len(self.serve_speeds)]
+        self.paddle.reset()
+        self.wall.create_wall(self.layout)
+        self.emit(ROUND_START)
+
+    def step(self, inp=NO_INPUT):
+        if inp.start and not self.live_ball:
+            self.start()
+
+        paddle = self.paddle
+        if inp.target_x is not None:
+            paddle.set_target(inp.target_x)
+
+        # keyboard moves the paddle directly and keeps touch control synced;
+        # the target is set before clamping, so holding a key against the
+        # edge still gives the paddle direction for spin. Only a key can
+        # push the paddle off screen, so only then does it need clamping
+        if inp.left or inp.right:
+            paddle.rect.x += paddle.speed * (inp.right - inp.left)
+            paddle.target_x = paddle.rect.centerx
+            paddle.clamp()
+
+        if self.live_ball:
+            # move paddle via smooth target following
+            paddle.move()
+            # move the balls, each with one pass over what it can hit
+            balls = self.balls
+            lost = None
+            for ball in balls:
+                if ball.move(self.wall, paddle, self.emit) == -1:
+                    if lost is None:
+                        lost = []
+                    lost.append(ball)
+            if lost is not None:
+                if len(lost) == len(balls):
+                    self.game_over = -1  # the last balls stay where they fell
+                else:
+                    for ball in lost:
+                        self.pool.release(ball)
+                    self.ball = balls[0]
+            if self.game_over == 0 and self.wall.live == 0:
+                self.game_over = 1
+            if self.game_over != 0:
+                self.live_ball = False
+                self.emit(WON if self.game_over == 1 else LOST)
+
+        return self.game_over
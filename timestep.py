@@ -0,0 +1,46 @@
+# Fixed-rate simulation clock for BreakOut3.
+#
+# The game's speeds are pixels per simulation step, so the physics has to run
+# at a fixed rate whatever the display does. FixedTimestep accumulates real
+# time and says how many steps to run each rendered frame; alpha is how far
+# the render time is between the last two steps, for interpolation.
+import time
+
+sim_rate = 60       # simulation steps per second (the physics is tuned for 60)
+max_steps = 5       # most catch-up steps per rendered frame
+
+
+class FixedTimestep:
+    def __init__(self, rate=sim_rate, max_steps=max_steps, clock=time.perf_counter):
+        self.dt = 1.0 / rate
+        self.max_steps = max_steps
+        self.clock = clock
+        self.last = None
+        self.accumulator = 0.0
+        self.dropped = 0.0  # seconds of simulation skipped to avoid a spiral of death
+
+    def reset(self):
+        self.last = None
+        self.accumulator = 0.0
+
+    def advance(self):
+        """Add the time since the last call and return how many steps to run."""
+        now = self.clock()
+        if self.last is None:
+            # first frame: run one step right away
+            self.last = now
+            self.accumulator = self.dt
+        self.accumulator += now - self.last
+        self.last = now
+        steps = int(self.accumulator / self.dt)
+        if steps > self.max_steps:
+            # too far behind: slow the game down instead of piling up steps
+            self.dropped += (steps - self.max_steps) * self.dt
+            self.accumulator -= (steps - self.max_steps) * self.dt
+            steps = self.max_steps
+        self.accumulator -= steps * self.dt
+        return steps
+
+    @property
+    def alpha(self):
+        return min(self.accumulator / self.dt, 1.0)